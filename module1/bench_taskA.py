@@ -0,0 +1,104 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# замеры производительности двоичного поиска
+# запуск:
+#   python bench_taskA.py batch [размер массива] [количество запросов]
+#   python bench_taskA.py index [размеры массивов...]
+#   python bench_taskA.py convert [размер массива]
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array as typed_array
+
+from taskA import binary_search, binary_search_batch, EytzingerIndex, convert_to_int64, open_int64
+
+INDEX_SIZES = [10 ** 5, 10 ** 7, 10 ** 8]
+INDEX_QUERIES = 10 ** 5
+
+
+def make_data(size, queries):
+    array = sorted(random.randrange(size * 2) for _ in range(size))
+    targets = [random.randrange(size * 2) for _ in range(queries)]
+    return array, targets
+
+
+def bench_batch(size, queries):
+    array, targets = make_data(size, queries)
+    print(f'array size: {size}, queries: {queries}')
+
+    start = time.perf_counter()
+    loop_result = [binary_search(array, 0, len(array) - 1, target) for target in targets]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_result = binary_search_batch(array, targets)
+    batch_time = time.perf_counter() - start
+
+    assert loop_result == batch_result
+    print(f'loop:  {len(targets) / loop_time:12.0f} queries/s')
+    print(f'batch: {len(targets) / batch_time:12.0f} queries/s')
+
+
+# на больших размерах массив хранится в int64, иначе список не помещается в память
+def bench_index(size):
+    array = typed_array('q', range(0, 2 * size, 2))
+    targets = [random.randrange(size * 2) for _ in range(INDEX_QUERIES)]
+    print(f'array size: {size}')
+
+    start = time.perf_counter()
+    index = EytzingerIndex(array)
+    print(f'index build: {time.perf_counter() - start:10.2f} s')
+
+    start = time.perf_counter()
+    plain_result = [binary_search(array, 0, size - 1, target) for target in targets]
+    plain_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_result = [index.search(target) for target in targets]
+    index_time = time.perf_counter() - start
+
+    assert plain_result == index_result
+    print(f'sorted array: {plain_time / len(targets) * 1e9:10.0f} ns/lookup')
+    print(f'eytzinger:    {index_time / len(targets) * 1e9:10.0f} ns/lookup')
+
+
+# Перевод в int64 и обратное чтение через mmap: случайный массив с замером времени и крайние случаи
+# текстового формата - пустая первая строка и строка search на месте пустого массива
+def bench_convert(size):
+    array = sorted(random.randrange(-size, size) for _ in range(size))
+    text = ' '.join(map(str, array)).encode() + b'\nsearch 1\n'
+    cases = [(b'\nsearch 1\nsearch 2\n', []), (b'search 1\n', []), (b'\n\n1 2 3\nsearch 2\n', [1, 2, 3]), (b'', [])]
+    print(f'array size: {size}')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'array.bin')
+        start = time.perf_counter()
+        convert_to_int64(io.BytesIO(text), path)
+        elapsed = time.perf_counter() - start
+        cases.append((text, array))
+        for case, expected in cases:
+            count = convert_to_int64(io.BytesIO(case), path)
+            mapped = open_int64(path)
+            assert count == len(expected) and mapped.tolist() == expected
+            mapped.release()
+        print(f'convert: {elapsed:8.2f} s, {len(text) / elapsed / 2 ** 20:8.1f} MiB/s')
+
+
+def main():
+    random.seed(0)
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'batch'
+    if mode == 'batch':
+        size = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 6
+        queries = int(sys.argv[3]) if len(sys.argv) > 3 else 10 ** 6
+        bench_batch(size, queries)
+    elif mode == 'index':
+        for size in [int(x) for x in sys.argv[2:]] or INDEX_SIZES:
+            bench_index(size)
+    elif mode == 'convert':
+        size = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 6
+        bench_convert(size)
+
+
+if __name__ == '__main__':
+    main()
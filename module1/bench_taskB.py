@@ -0,0 +1,110 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# замеры производительности дека
+# запуск:
+#   python bench_taskB.py commands [количество команд]
+#   python bench_taskB.py contention [производители] [потребители] [элементов на производителя]
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from itertools import chain, cycle, islice
+
+from taskB import run, BlockingDeque, AsyncDeque
+
+PATTERN_SIZE = 10 ** 4
+
+
+# случайная смесь команд, в том числе ошибочных, которая повторяется до нужного количества
+def make_commands(count):
+    pattern = []
+    for _ in range(PATTERN_SIZE):
+        kind = random.random()
+        if kind < 0.3:
+            pattern.append(f'pushb {random.randrange(10 ** 6)}')
+        elif kind < 0.6:
+            pattern.append(f'pushf {random.randrange(10 ** 6)}')
+        elif kind < 0.75:
+            pattern.append('popb')
+        elif kind < 0.9:
+            pattern.append('popf')
+        elif kind < 0.95:
+            pattern.append('pushb  1')
+        else:
+            pattern.append('')
+    return chain(['set_size 1000'], islice(cycle(pattern), count))
+
+
+def bench_commands(count):
+    with open(os.devnull, 'w') as output_stream:
+        start = time.perf_counter()
+        run(make_commands(count), output_stream)
+        elapsed = time.perf_counter() - start
+    print(f'commands: {count}, {elapsed:.2f} s, {count / elapsed:.0f} commands/s')
+
+
+# каждый потребитель забирает одинаковую долю элементов, поэтому producers * items должно делиться на consumers
+def bench_threads(producers, consumers, items, size):
+    deq = BlockingDeque(size)
+
+    def produce():
+        for value in range(items):
+            deq.push_back(value)
+
+    def consume():
+        for _ in range(producers * items // consumers):
+            deq.pop_front()
+
+    workers = [threading.Thread(target=produce) for _ in range(producers)]
+    workers += [threading.Thread(target=consume) for _ in range(consumers)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def bench_tasks(producers, consumers, items, size):
+    async def session():
+        deq = AsyncDeque(size)
+
+        async def produce():
+            for value in range(items):
+                await deq.push_back(value)
+
+        async def consume():
+            for _ in range(producers * items // consumers):
+                await deq.pop_front()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[produce() for _ in range(producers)], *[consume() for _ in range(consumers)])
+        return time.perf_counter() - start
+
+    return asyncio.run(session())
+
+
+def bench_contention(producers, consumers, items, size=64):
+    total = producers * items
+    print(f'producers: {producers}, consumers: {consumers}, items: {total}, deque size: {size}')
+    elapsed = bench_threads(producers, consumers, items, size)
+    print(f'threads: {total / elapsed:12.0f} items/s')
+    elapsed = bench_tasks(producers, consumers, items, size)
+    print(f'asyncio: {total / elapsed:12.0f} items/s')
+
+
+def main():
+    random.seed(0)
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'commands'
+    if mode == 'commands':
+        bench_commands(int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 7)
+    elif mode == 'contention':
+        producers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+        consumers = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+        items = int(sys.argv[4]) if len(sys.argv) > 4 else 10 ** 4
+        bench_contention(producers, consumers, items)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# замер масштабирования параллельного обхода в ширину
+# запуск: python bench_taskC.py [количество вершин] [количество ребер]
+import random
+import sys
+import time
+
+from taskC import CSRGraph, ParallelGraph, bfs
+
+WORKERS = [1, 2, 4, 8]
+
+
+def make_graph(vertices, edges):
+    return CSRGraph(((str(random.randrange(vertices)), str(random.randrange(vertices))) for _ in range(edges)), False)
+
+
+def main():
+    vertices = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    edges = int(sys.argv[2]) if len(sys.argv) > 2 else 4 * 10 ** 6
+    random.seed(0)
+    graph = make_graph(vertices, edges)
+    start_vertex = graph.names[0]
+    print(f'vertices: {len(graph.names)}, edges: {edges}')
+
+    start = time.perf_counter()
+    expected = list(bfs(graph, start_vertex))
+    print(f'sequential bfs: {time.perf_counter() - start:8.2f} s')
+
+    for workers in WORKERS:
+        with ParallelGraph(graph, workers) as parallel_graph:
+            start = time.perf_counter()
+            assert list(parallel_graph.bfs(start_vertex)) == expected
+            bfs_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            components = parallel_graph.connected_components()
+            components_time = time.perf_counter() - start
+        print(f'workers: {workers}, bfs: {bfs_time:8.2f} s, '
+              f'components ({len(components)}): {components_time:8.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,19 @@
 # Copyright Boris Ermolovich ermolovich.boris@gmail.com
 # двоичный поиск
+import mmap
+import os
 import sys
+from array import array as typed_array
+from bisect import bisect_left
+from itertools import chain, islice
+
+CHUNK_SIZE = 1 << 20
+QUERY_CHUNK_SIZE = 1 << 14
 
 
 def binary_search(array, start_index, end_index, target):
     if end_index >= start_index:
-        mid_index = int(end_index - start_index // 2)
+        mid_index = (start_index + end_index) // 2
         if array[mid_index] == target:
             if mid_index == start_index or array[mid_index - 1] < target:
                 return mid_index
@@ -19,17 +27,150 @@ def binary_search(array, start_index, end_index, target):
         return -1
 
 
+# пакетный поиск: запросы сортируются и проходят по массиву слева направо,
+# левая граница поиска для следующего запроса не меньше предыдущего ответа
+def binary_search_batch(array, targets):
+    result = [-1] * len(targets)
+    length = len(array)
+    start_index = 0
+    previous = None
+    answer = -1
+    for position in sorted(range(len(targets)), key=targets.__getitem__):
+        target = targets[position]
+        if target != previous:
+            start_index = bisect_left(array, target, start_index, length)
+            answer = start_index if start_index < length and array[start_index] == target else -1
+            previous = target
+        result[position] = answer
+    return result
+
+
+# индекс в порядке Эйтцингера: элементы хранятся в порядке обхода дерева поиска в ширину,
+# поэтому первые шаги всех поисков приходятся на несколько соседних строк кэша.
+# Значения должны помещаться в int64
+class EytzingerIndex:
+    def __init__(self, array):
+        self.length = len(array)
+        self.keys = typed_array('q', bytes(8 * (self.length + 1)))
+        self.positions = typed_array('q', bytes(8 * (self.length + 1)))
+        # симметричный обход неявного дерева раздаёт узлам элементы по возрастанию
+        index = 0
+        node = 1
+        stack = []
+        while stack or node <= self.length:
+            if node <= self.length:
+                stack.append(node)
+                node *= 2
+            else:
+                node = stack.pop()
+                self.keys[node] = array[index]
+                self.positions[node] = index
+                index += 1
+                node = 2 * node + 1
+
+    # первый индекс target в исходном массиве или -1
+    def search(self, target):
+        keys = self.keys
+        node = 1
+        while node <= self.length:
+            node = 2 * node + (keys[node] < target)
+        # подъём к последнему узлу, где спуск ушёл влево, - это первый элемент >= target
+        node >>= (~node & (node + 1)).bit_length()
+        if node and keys[node] == target:
+            return self.positions[node]
+        return -1
+
+
+# перевод первой непустой строки текстового формата в файл из int64 (порядок байт платформы),
+# вход читается блоками, поэтому строка целиком в памяти не держится. Как и в main, строка search
+# на месте массива означает пустой массив, тогда файл остается пустым. Возвращает количество чисел
+def convert_to_int64(input_stream, path):
+    count = 0
+    buffer = b''
+    with open(path, 'wb') as output:
+        while True:
+            chunk = input_stream.read(CHUNK_SIZE)
+            buffer += chunk
+            if not count:
+                buffer = buffer.lstrip()
+            line_end = buffer.find(b'\n')
+            done = not chunk or line_end != -1
+            if line_end != -1:
+                buffer = buffer[:line_end]
+            tokens = buffer.split()
+            buffer = b''
+            if not done and tokens and not chunk[-1:].isspace():
+                buffer = tokens.pop()
+            if not count and tokens and tokens[0] == b'search':
+                return 0
+            numbers = typed_array('q', map(int, tokens))
+            numbers.tofile(output)
+            count += len(numbers)
+            if done:
+                return count
+
+
+# отображение файла int64 в память без копирования, с диска читаются только затронутые страницы
+def open_int64(path):
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return memoryview(b'').cast('q')
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast('q')
+
+
+# потоковый режим: запросы читаются порциями по chunk_size строк,
+# ответы на порцию пишутся в output_stream одной записью
+def search_stream(array, queries, output_stream, chunk_size=QUERY_CHUNK_SIZE):
+    while True:
+        lines = list(islice(queries, chunk_size))
+        if not lines:
+            return
+        answers = binary_search_batch(array, [int(line.split()[1]) for line in lines])
+        output_stream.write('\n'.join(map(str, answers)) + '\n')
+
+
+# в потоковом режиме строка search на месте массива означает пустой массив
+# и сама считается запросом
+def main_stream(mapped_path):
+    lines = (line for line in sys.stdin if line.strip())
+    if mapped_path:
+        array = open_int64(mapped_path)
+    else:
+        first_line = next(lines, '')
+        if 'search' in first_line.split():
+            array = []
+            lines = chain([first_line], lines)
+        else:
+            array = [int(x) for x in first_line.split()]
+    search_stream(array, lines, sys.stdout)
+
+
 def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--convert':
+        convert_to_int64(sys.stdin.buffer, sys.argv[2])
+        return
+
+    mapped_path = sys.argv[sys.argv.index('--mmap') + 1] if '--mmap' in sys.argv[1:-1] else None
+    if '--stream' in sys.argv[1:]:
+        main_stream(mapped_path)
+        return
+
     std_input = sys.stdin.read().strip().splitlines()
     array = []
-    if 'search' in std_input[0].split():
-        for i in range(len(std_input) - 1):
-            print(-1)
+    answers = []
+    queries = std_input[1:]
+    if mapped_path:
+        array = open_int64(mapped_path)
+        queries = std_input
+    elif 'search' in std_input[0].split():
+        answers = [-1] * (len(std_input) - 1)
     else:
         array = [int(x) for x in std_input[0].split()]
-    for line in std_input[1:]:
-        number = int(line.split()[1])
-        print(binary_search(array, 0, len(array) - 1, number))
+    targets = [int(line.split()[1]) for line in queries]
+    answers += binary_search_batch(array, targets)
+    if answers:
+        print('\n'.join(map(str, answers)))
 
 
 if __name__ == '__main__':
@@ -1,113 +1,344 @@
 # Copyright Boris Ermolovich ermolovich.boris@gmail.com
 # двунаправленная очередь
+import asyncio
 import sys
-import re
+import threading
+from array import array
 
+CHUNK_SIZE = 1 << 16
+OUTPUT_BLOCK_SIZE = 1 << 12
+LINE_BREAKS = '\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
 
+
+# Дек на кольцевом буфере. Переполнение сообщается OverflowError, извлечение из пустого дека - IndexError.
+# growable - при заполнении буфер увеличивается вдвое с сохранением порядка элементов,
+# typecode - хранение значений в array с указанным типом вместо списка; значение вне диапазона типа - ValueError,
+# а не OverflowError от array, чтобы его нельзя было принять за переполнение дека
 class Deque:
-    def __init__(self, size):
-        if size >= 0:
-            self.n = size
-        else:
-            self.n = 0
-            print('error')
-        self.deque = [None] * self.n
+    def __init__(self, size, growable=False, typecode=None):
+        if size < 0:
+            raise ValueError('error')
+        self.n = size
+        self.growable = growable
+        self.typecode = typecode
+        self.blank = None if typecode is None else 0
+        self.deque = self._storage([self.blank] * self.n)
         self.front = 0
         self.back = 0
         self.size = 0
 
-    def print_deque(self):
-        if self.size == 0:
-            print('empty')
-        else:
-            ind = self.front
-            data = []
-            for i in range(self.size):
-                data.append(self.deque[ind])
-                ind = (ind + 1) % self.n
-            print(' '.join(map(str, data)))
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self._read(self.front, self.size))
+
+    def _storage(self, items):
+        if self.typecode is None:
+            return items
+        try:
+            return array(self.typecode, items)
+        except OverflowError:
+            raise ValueError('error') from None
+
+    def _set(self, index, value):
+        try:
+            self.deque[index] = value
+        except OverflowError:
+            raise ValueError('error') from None
+
+    # count элементов подряд начиная с позиции start с учетом перехода через конец буфера
+    def _read(self, start, count):
+        end = start + count
+        if end <= self.n:
+            return list(self.deque[start:end])
+        return list(self.deque[start:]) + list(self.deque[:end - self.n])
+
+    def _write(self, start, items):
+        first = min(len(items), self.n - start)
+        self.deque[start:start + first] = self._storage(items[:first])
+        self.deque[:len(items) - first] = self._storage(items[first:])
+
+    def _reserve(self, count):
+        if self.size + count <= self.n:
+            return
+        if not self.growable:
+            raise OverflowError('overflow')
+        items = self._read(self.front, self.size)
+        self.n = max(self.size + count, 2 * self.n)
+        self.deque = self._storage(items + [self.blank] * (self.n - self.size))
+        self.front = 0
+        self.back = self.size % self.n
 
     def push_back(self, to_add):
-        if self.size == self.n:
-            print('overflow')
-        else:
-            self.deque[self.back] = to_add
-            self.back = (self.back + 1) % self.n
-            self.size += 1
+        self._reserve(1)
+        self._set(self.back, to_add)
+        self.back = (self.back + 1) % self.n
+        self.size += 1
 
     def push_front(self, to_add):
-        if self.size == self.n:
-            print('overflow')
-        else:
-            self.front = (self.front - 1) % self.n
-            self.deque[self.front] = to_add
-            self.size += 1
+        self._reserve(1)
+        front = (self.front - 1) % self.n
+        self._set(front, to_add)
+        self.front = front
+        self.size += 1
 
     def pop_back(self):
         if self.size == 0:
-            print('underflow')
-        else:
-            value = self.deque[self.back - 1]
-            self.back = (self.back - 1) % self.n
-            self.size -= 1
-            print(value)
+            raise IndexError('underflow')
+        value = self.deque[self.back - 1]
+        self.back = (self.back - 1) % self.n
+        self.size -= 1
+        return value
 
     def pop_front(self):
         if self.size == 0:
-            print('underflow')
-        else:
-            value = self.deque[self.front]
-            self.front = (self.front + 1) % self.n
-            self.size -= 1
-            print(value)
+            raise IndexError('underflow')
+        value = self.deque[self.front]
+        self.front = (self.front + 1) % self.n
+        self.size -= 1
+        return value
 
+    # пакетные операции выполняются целиком или не выполняются вовсе
+    def extend(self, items):
+        items = list(items)
+        if not items:
+            return
+        self._reserve(len(items))
+        self._write(self.back, items)
+        self.back = (self.back + len(items)) % self.n
+        self.size += len(items)
 
-def main():
+    # как и в collections.deque, элементы попадают в начало по одному, т.е. в обратном порядке
+    def extendleft(self, items):
+        items = list(items)
+        if not items:
+            return
+        self._reserve(len(items))
+        front = (self.front - len(items)) % self.n
+        self._write(front, items[::-1])
+        self.front = front
+        self.size += len(items)
+
+    # count элементов в порядке, в котором их вернули бы последовательные pop_front (pop_back при back=True);
+# отрицательный count - ValueError
+    def pop_n(self, count, back=False):
+        if count < 0:
+            raise ValueError('error')
+        if count > self.size:
+            raise IndexError('underflow')
+        if back:
+            self.back = (self.back - count) % self.n if count else self.back
+            self.size -= count
+            return self._read(self.back, count)[::-1]
+        items = self._read(self.front, count)
+        self.front = (self.front + count) % self.n if count else self.front
+        self.size -= count
+        return items
+
+
+# Ограниченный дек для обмена между потоками: push ждет свободного места, pop - элемента.
+# timeout=None - ждать без ограничения; по истечении таймаута push бросает OverflowError, pop - IndexError.
+# Если операция над ring бросила исключение, доставшееся пробуждение передается следующему ожидающему
+class BlockingDeque:
+    def __init__(self, size, typecode=None):
+        self.ring = Deque(size, typecode=typecode)
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+        self.not_empty = threading.Condition(self.lock)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.ring)
+
+    def _push(self, push, to_add, timeout):
+        with self.not_full:
+            if not self.not_full.wait_for(lambda: self.ring.size < self.ring.n, timeout):
+                raise OverflowError('overflow')
+            try:
+                push(to_add)
+            except Exception:
+                self.not_full.notify()
+                raise
+            self.not_empty.notify()
+
+    def _pop(self, pop, timeout):
+        with self.not_empty:
+            if not self.not_empty.wait_for(lambda: self.ring.size, timeout):
+                raise IndexError('underflow')
+            try:
+                value = pop()
+            except Exception:
+                self.not_empty.notify()
+                raise
+            self.not_full.notify()
+            return value
+
+    def push_back(self, to_add, timeout=None):
+        self._push(self.ring.push_back, to_add, timeout)
+
+    def push_front(self, to_add, timeout=None):
+        self._push(self.ring.push_front, to_add, timeout)
+
+    def pop_back(self, timeout=None):
+        return self._pop(self.ring.pop_back, timeout)
+
+    def pop_front(self, timeout=None):
+        return self._pop(self.ring.pop_front, timeout)
+
+
+# То же для задач asyncio: методы - корутины, ожидание не блокирует цикл событий
+class AsyncDeque:
+    def __init__(self, size, typecode=None):
+        self.ring = Deque(size, typecode=typecode)
+        lock = asyncio.Lock()
+        self.not_full = asyncio.Condition(lock)
+        self.not_empty = asyncio.Condition(lock)
+
+    def __len__(self):
+        return len(self.ring)
+
+    # Таймаут может сработать сразу после notify, доставшегося этому ожидающему. Тогда условие проверяется
+    # еще раз, как в threading.Condition.wait_for, а если оно не выполнено, пробуждение передается дальше,
+    # чтобы не потерялось для других ожидающих. False - условие так и не выполнилось
+    @staticmethod
+    async def _wait(condition, predicate, timeout):
+        try:
+            await asyncio.wait_for(condition.wait_for(predicate), timeout)
+        except asyncio.TimeoutError:
+            if predicate():
+                return True
+            condition.notify()
+            return False
+        return True
+
+    async def _push(self, push, to_add, timeout):
+        async with self.not_full:
+            if not await self._wait(self.not_full, lambda: self.ring.size < self.ring.n, timeout):
+                raise OverflowError('overflow')
+            try:
+                push(to_add)
+            except Exception:
+                self.not_full.notify()
+                raise
+            self.not_empty.notify()
+
+    async def _pop(self, pop, timeout):
+        async with self.not_empty:
+            if not await self._wait(self.not_empty, lambda: self.ring.size, timeout):
+                raise IndexError('underflow')
+            try:
+                value = pop()
+            except Exception:
+                self.not_empty.notify()
+                raise
+            self.not_full.notify()
+            return value
+
+    async def push_back(self, to_add, timeout=None):
+        await self._push(self.ring.push_back, to_add, timeout)
+
+    async def push_front(self, to_add, timeout=None):
+        await self._push(self.ring.push_front, to_add, timeout)
+
+    async def pop_back(self, timeout=None):
+        return await self._pop(self.ring.pop_back, timeout)
+
+    async def pop_front(self, timeout=None):
+        return await self._pop(self.ring.pop_front, timeout)
+
+
+# построчное чтение блоками по CHUNK_SIZE символов с теми же границами строк, что у str.splitlines
+def read_lines(input_stream):
+    tail = ''
+    while True:
+        chunk = input_stream.read(CHUNK_SIZE)
+        if not chunk:
+            if tail:
+                yield tail
+            return
+        text = tail + chunk
+        lines = text.splitlines()
+        tail = '' if text[-1] in LINE_BREAKS else lines.pop()
+        yield from lines
+
+
+# Интерпретатор команд дека. Токены, разделенные пробельными символами, и правила расстановки
+# пробелов те же, что у разбора re.findall(r'\S+|\s+', line): команда без аргумента не содержит
+# пробельных символов, команда с аргументом - ровно один пробел между словами.
+# Ответы копятся и записываются в output_stream блоками по block_size строк
+def run(lines, output_stream, block_size=OUTPUT_BLOCK_SIZE):
     deq = None
-    allocated = False
-    for command in sys.stdin.read().splitlines():
-        if not command.strip():
-            continue
+    output = []
+    write = output.append
+    single_commands = {}
+    pair_commands = {}
 
-        content = re.findall(r'\S+|\s+', command)
+    def pop(method):
+        def command():
+            try:
+                return str(method())
+            except IndexError:
+                return 'underflow'
+        return command
 
-        if content[0] == 'set_size' and not allocated and int(content[2]) >= 0:
+    def push(method):
+        def command(value):
             try:
-                size = int(content[2])
-                deq = Deque(size)
-                allocated = True
-            except ValueError:
-                print('error')
+                method(value)
+            except OverflowError:
+                write('overflow')
+        return command
 
-        elif not allocated:
-            print("error")
+    for line in lines:
+        parts = line.split()
+        if not parts:
             continue
 
-        elif len(content) == 1:
-            head = content[0]
-            if head == 'print':
-                deq.print_deque()
-            elif head == 'popb':
-                deq.pop_back()
-            elif head == 'popf':
-                deq.pop_front()
-            else:
-                print('error')
-        elif len(content) == 3 and content[1] == ' ':
-            head = None
-            value = None
+        if deq is None:
+            size = None
+            if parts[0] == 'set_size' and not line[0].isspace() and len(parts) > 1:
+                try:
+                    size = int(parts[1])
+                except ValueError:
+                    pass
+            if size is None or size < 0:
+                write('error')
+                continue
             try:
-                head, value = content[0], content[2]
-            except ValueError:
-                print('error')
-            if head == 'pushb':
-                deq.push_back(value)
-            elif head == 'pushf':
-                deq.push_front(value)
+                deq = Deque(size)
+            except (ValueError, OverflowError):
+                write('error')
+                continue
+            single_commands = {
+                'print': lambda: ' '.join(map(str, deq)) if len(deq) else 'empty',
+                'popb': pop(deq.pop_back),
+                'popf': pop(deq.pop_front),
+            }
+            pair_commands = {'pushb': push(deq.push_back), 'pushf': push(deq.push_front)}
+
+        elif len(parts) == 1 and len(parts[0]) == len(line):
+            command = single_commands.get(line)
+            write(command() if command else 'error')
+        elif len(parts) == 2 and len(line) == len(parts[0]) + len(parts[1]) + 1 and line[len(parts[0])] == ' ':
+            command = pair_commands.get(parts[0])
+            if command:
+                command(parts[1])
             else:
-                print('error')
+                write('error')
         else:
-            print('error')
+            write('error')
+
+        if len(output) >= block_size:
+            output_stream.write('\n'.join(output) + '\n')
+            output.clear()
+
+    if output:
+        output_stream.write('\n'.join(output) + '\n')
+
+
+def main():
+    run(read_lines(sys.stdin), sys.stdout)
 
 
 if __name__ == '__main__':
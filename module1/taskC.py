@@ -1,48 +1,271 @@
 # Copyright Boris Ermolovich ermolovich.boris@gmail.com
 # обход графа
 import sys
-from collections import defaultdict, deque
+from array import array
+from collections import deque
+from multiprocessing import Pool, shared_memory
 
+CHUNK_SIZE = 1 << 16
+PARALLEL_THRESHOLD = 1 << 10
 
+
+# Граф в формате CSR: соседи вершины i - targets[offsets[i]:offsets[i + 1]].
+# Номера вершин выдаются в порядке имен, поэтому списки соседей, отсортированные
+# один раз по номеру, совпадают с отсортированными по имени. При построении ребра хранятся
+# только в массивах int64: степени вершин подсчитываются в offsets, концы ребер раскладываются
+# по своим строкам targets, и затем сортируется каждая строка отдельно
+class CSRGraph:
+    def __init__(self, edges, directed):
+        ids = {}
+        sources = array('q')
+        targets = array('q')
+        for u, v in edges:
+            sources.append(ids.setdefault(u, len(ids)))
+            targets.append(ids.setdefault(v, len(ids)))
+
+        self.names = sorted(ids)
+        n = len(self.names)
+        rank = array('q', bytes(8 * n))
+        for new_id, name in enumerate(self.names):
+            rank[ids[name]] = new_id
+        self.ids = {name: new_id for new_id, name in enumerate(self.names)}
+        del ids
+        sources = array('q', map(rank.__getitem__, sources))
+        targets = array('q', map(rank.__getitem__, targets))
+        del rank
+
+        offsets = array('q', bytes(8 * (n + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        if not directed:
+            for target in targets:
+                offsets[target + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        result = array('q', bytes(8 * offsets[n]))
+        position = offsets[:n]
+        for source, target in zip(sources, targets):
+            result[position[source]] = target
+            position[source] += 1
+        if not directed:
+            for source, target in zip(sources, targets):
+                result[position[target]] = source
+                position[target] += 1
+        del sources, targets, position
+
+        for i in range(n):
+            start, end = offsets[i], offsets[i + 1]
+            if end - start > 1:
+                result[start:end] = array('q', sorted(result[start:end]))
+        self.offsets = offsets
+        self.targets = result
+
+    def neighbors(self, vertex_id):
+        return self.targets[self.offsets[vertex_id]:self.offsets[vertex_id + 1]]
+
+
+# построчное чтение ребер блоками примерно по chunk_size символов, пустые строки пропускаются
+def read_edges(input_stream, chunk_size=CHUNK_SIZE):
+    while True:
+        lines = input_stream.readlines(chunk_size)
+        if not lines:
+            return
+        for line in lines:
+            edge = line.split()
+            if edge:
+                u, v = edge
+                yield u, v
+
+
+# обходы - генераторы: вершины выдаются по мере посещения, и обход можно прервать в любой момент
 def dfs(graph, start):
-    visited = set()
-    stack = [start]
+    if start not in graph.ids:
+        yield start
+        return
+    visited = bytearray(len(graph.names))
+    stack = [graph.ids[start]]
 
     while stack:
         vertex = stack.pop()
-        if vertex not in visited:
-            print(vertex)
-            visited.add(vertex)
-            stack.extend(sorted(graph[vertex], reverse=True))
+        if not visited[vertex]:
+            yield graph.names[vertex]
+            visited[vertex] = 1
+            stack.extend(reversed(graph.neighbors(vertex)))
 
 
 def bfs(graph, start):
-    visited = set()
-    queue = deque([start])
+    if start not in graph.ids:
+        yield start
+        return
+    visited = bytearray(len(graph.names))
+    queue = deque([graph.ids[start]])
 
     while queue:
         vertex = queue.popleft()
-        if vertex not in visited:
-            print(vertex)
-            visited.add(vertex)
-            queue.extend(sorted(graph[vertex]))
+        if not visited[vertex]:
+            yield graph.names[vertex]
+            visited[vertex] = 1
+            queue.extend(graph.neighbors(vertex))
+
+
+# массивы CSR и состояние обхода, подключенные к общей памяти в процессе пула
+_shared = {}
+
+
+def _attach(arrays):
+    for key, name, fmt in arrays:
+        memory = shared_memory.SharedMemory(name=name)
+        _shared[key + '_memory'] = memory
+        _shared[key] = memory.buf.cast(fmt)
+
+
+# Фаза 1: непосещенные соседи вершин frontier[start:end] без повторов в порядке первого появления и они же,
+# разложенные по владельцам - процессам, отвечающим за равные отрезки номеров вершин
+def _discover(start, end, owners):
+    offsets, targets, visited, frontier = _shared['offsets'], _shared['targets'], _shared['visited'], _shared['frontier']
+    n = len(visited)
+    seen = set()
+    found = array('q')
+    buckets = [array('q') for _ in range(owners)]
+    for vertex in frontier[start:end]:
+        for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+            if not visited[neighbor] and neighbor not in seen:
+                seen.add(neighbor)
+                found.append(neighbor)
+                buckets[neighbor * owners // n].append(neighbor)
+    return found.tobytes(), [bucket.tobytes() for bucket in buckets]
+
+
+# Фаза 2: владелец отрезка отдает каждую свою вершину первой по порядку части фронта, которая ее нашла:
+# записывает в claim base + номер части и отмечает вершину посещенной. Вершины отрезка пишет только его владелец
+def _claim(parts, base):
+    claim, visited = _shared['claim'], _shared['visited']
+    for part, vertices in enumerate(parts):
+        for vertex in array('q', vertices):
+            if not visited[vertex]:
+                visited[vertex] = 1
+                claim[vertex] = base + part
+
+
+# Фаза 3: найденные частью фронта вершины, которые достались ей (claim == stamp), в прежнем порядке
+def _collect(found, stamp):
+    claim = _shared['claim']
+    return array('q', [vertex for vertex in array('q', found) if claim[vertex] == stamp]).tobytes()
+
+
+# Поуровневый обход в ширину над массивами CSR в общей памяти. Уровень строится в три фазы, каждая в пуле:
+# части фронта находят непосещенных соседей и раздают их владельцам отрезков номеров, владельцы отдают
+# вершину первой нашедшей ее части и отмечают посещение, затем каждая часть оставляет доставшиеся ей вершины.
+# Главный процесс только склеивает части по порядку, поэтому порядок вершин тот же, что у bfs. Списки вершин
+# передаются байтами array('q'). Небольшие фронты и фронты при одном процессе раскрываются в главном процессе.
+# Пул и общая память освобождаются в close()
+class ParallelGraph:
+    def __init__(self, graph, workers):
+        self.graph = graph
+        self.workers = workers
+        self._memory = []
+        self._views = []
+        n = len(graph.names)
+        self.offsets = self._share(graph.offsets, 'q')
+        self.targets = self._share(graph.targets, 'q')
+        self.visited = self._share(bytes(n), 'B')
+        self.claim = self._share(bytes(8 * n), 'q')
+        self.frontier = self._share(bytes(8 * n), 'q')
+        self._stamp = 1  # номер первой части фронта в claim, растет от уровня к уровню, 0 - вершину никто не забрал
+        arrays = tuple(zip(('offsets', 'targets', 'visited', 'claim', 'frontier'),
+                           (memory.name for memory in self._memory), ('q', 'q', 'B', 'q', 'q')))
+        self.pool = Pool(workers, initializer=_attach, initargs=(arrays,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _share(self, data, fmt):
+        data = memoryview(data).cast('B')
+        memory = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+        memory.buf[:data.nbytes] = data
+        self._memory.append(memory)
+        view = memory.buf[:data.nbytes].cast(fmt)
+        self._views.append(view)
+        return view
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for view in self._views:
+            view.release()
+        for memory in self._memory:
+            memory.close()
+            memory.unlink()
+
+    def _next_frontier(self, frontier):
+        found = array('q')
+        if self.workers == 1 or len(frontier) < PARALLEL_THRESHOLD:
+            offsets, targets, visited = self.offsets, self.targets, self.visited
+            for vertex in frontier:
+                for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        found.append(neighbor)
+            return found
+
+        self.frontier[:len(frontier)] = frontier
+        step = -(-len(frontier) // (4 * self.workers))
+        parts = self.pool.starmap(_discover, [(start, min(start + step, len(frontier)), self.workers)
+                                              for start in range(0, len(frontier), step)])
+        base = self._stamp
+        self._stamp += len(parts)
+        self.pool.starmap(_claim, [([buckets[owner] for _, buckets in parts], base)
+                                   for owner in range(self.workers)])
+        for vertices in self.pool.starmap(_collect, [(vertices, base + part)
+                                                     for part, (vertices, _) in enumerate(parts)]):
+            found.frombytes(vertices)
+        return found
+
+    def _levels(self, source, with_depth):
+        names = self.graph.names
+        self.visited[source] = 1
+        frontier = array('q', [source])
+        depth = 0
+        while frontier:
+            for vertex in frontier:
+                yield (names[vertex], depth) if with_depth else names[vertex]
+            frontier = self._next_frontier(frontier)
+            depth += 1
+
+    # with_depth - выдавать пары (вершина, глубина)
+    def bfs(self, start, with_depth=False):
+        if start not in self.graph.ids:
+            yield (start, 0) if with_depth else start
+            return
+        self.visited[:] = bytes(len(self.visited))
+        yield from self._levels(self.graph.ids[start], with_depth)
+
+    # компоненты связности неориентированного графа в порядке наименьшей вершины,
+    # вершины каждой компоненты - в порядке обхода в ширину
+    def connected_components(self):
+        self.visited[:] = bytes(len(self.visited))
+        components = []
+        for vertex in range(len(self.graph.names)):
+            if not self.visited[vertex]:
+                components.append(list(self._levels(vertex, False)))
+        return components
 
 
 def main():
-    lines = sys.stdin.read().strip().splitlines()
-    graph_type, start_vertex, search_type = lines[0].strip().split()
-    graph = defaultdict(list)
-
-    for edge in lines[1:]:
-        u, v = edge.split()
-        graph[u].append(v)
-        if graph_type == 'u':
-            graph[v].append(u)
-
-    if search_type == 'd':
-        dfs(graph, start_vertex)
-    elif search_type == 'b':
-        bfs(graph, start_vertex)
+    header = ''
+    for header in sys.stdin:
+        if header.strip():
+            break
+    graph_type, start_vertex, search_type = header.strip().split()
+    graph = CSRGraph(read_edges(sys.stdin), graph_type != 'u')
+
+    traversals = {'d': dfs, 'b': bfs}
+    if search_type in traversals:
+        sys.stdout.writelines(f'{vertex}\n' for vertex in traversals[search_type](graph, start_vertex))
 
 
 if __name__ == "__main__":
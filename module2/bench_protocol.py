@@ -0,0 +1,66 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# замер разбора команд: один и тот же сценарий прогоняется через каждую структуру
+# запуск: python bench_protocol.py [количество команд] [количество ключей]
+import os
+import random
+import sys
+import time
+
+import taskA
+import taskB
+import taskC
+from protocol import run
+
+STRUCTURES = [
+    ('BST', taskA.commands, taskA.BST),
+    ('AVLTree', taskA.commands, taskA.AVLTree),
+    ('SplayTree', taskB.commands, taskB.SplayTree),
+    ('TopDownSplayTree', taskB.commands, taskB.TopDownSplayTree),
+    ('MinHeap', taskC.commands, taskC.MinHeap),
+    ('MinMaxHeap', taskC.commands, taskC.MinMaxHeap),
+    ('ArrayHeap', taskC.commands, taskC.ArrayHeap),
+]
+
+
+# случайная смесь команд со случайными ключами, в том числе ошибочных; print не используется,
+# чтобы замер не сводился к выводу всей структуры
+def make_script(count, keys):
+    script = []
+    for _ in range(count):
+        kind = random.random()
+        key = random.randrange(keys)
+        if kind < 0.35:
+            script.append(f'add {key} value{key}\n')
+        elif kind < 0.45:
+            script.append(f'set {key} other{key}\n')
+        elif kind < 0.7:
+            script.append(f'search {key}\n')
+        elif kind < 0.8:
+            script.append(f'delete {key}\n')
+        elif kind < 0.85:
+            script.append('min\n')
+        elif kind < 0.9:
+            script.append('max\n')
+        elif kind < 0.95:
+            script.append('extract\n')
+        else:
+            script.append(f'add  {key}x\n')
+    return script
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    keys = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 4
+    random.seed(0)
+    script = make_script(count, keys)
+    print(f'commands: {count}, keys: {keys}')
+    with open(os.devnull, 'w') as output_stream:
+        for name, commands, structure_class in STRUCTURES:
+            start = time.perf_counter()
+            run(script, commands(structure_class()), output_stream)
+            elapsed = time.perf_counter() - start
+            print(f'{name:18} {count / elapsed:12.0f} commands/s')
+
+
+if __name__ == '__main__':
+    main()
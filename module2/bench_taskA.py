@@ -0,0 +1,77 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# замеры производительности двоичного дерева поиска
+# запуск:
+#   python bench_taskA.py streams [количество ключей]
+#   python bench_taskA.py memory [количество ключей]
+import random
+import sys
+import time
+import tracemalloc
+
+from taskA import BST, AVLTree, Node
+
+# На упорядоченных потоках несбалансированное дерево вырождается в список и каждая операция стоит O(n),
+# поэтому для него такие потоки обрезаются до этого количества ключей
+UNBALANCED_LIMIT = 5 * 10 ** 3
+
+
+# узел с __dict__, как до перехода на __slots__
+class DictNode(Node):
+    pass
+
+
+def key_streams(count):
+    keys = list(range(count))
+    shuffled = keys[:]
+    random.shuffle(shuffled)
+    return {'sorted': keys, 'reverse': keys[::-1], 'random': shuffled}
+
+
+def bench_tree(tree_class, keys):
+    tree = tree_class()
+    start = time.perf_counter()
+    for key in keys:
+        tree.add(key, 'v')
+    for key in keys:
+        tree.search(key)
+    for key in keys:
+        tree.delete(key)
+    return 3 * len(keys) / (time.perf_counter() - start)
+
+
+def bench_streams(count):
+    for stream, keys in key_streams(count).items():
+        for tree_class in BST, AVLTree:
+            stream_keys = keys[:UNBALANCED_LIMIT] if tree_class is BST and stream != 'random' else keys
+            print(f'{stream:8} {tree_class.__name__:8} {len(stream_keys):8} keys '
+                  f'{bench_tree(tree_class, stream_keys):12.0f} ops/s')
+
+
+def bytes_per_key(node_class, count):
+    tree = BST()
+    tree.node_class = node_class
+    tracemalloc.start()
+    tree.bulk_load((key, 'v') for key in range(count))
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / count
+
+
+def bench_memory(count):
+    print(f'keys: {count}')
+    for node_class in DictNode, Node:
+        print(f'{node_class.__name__:8} {bytes_per_key(node_class, count):8.1f} bytes/key')
+
+
+def main():
+    random.seed(0)
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'streams'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 5
+    if mode == 'streams':
+        bench_streams(count)
+    elif mode == 'memory':
+        bench_memory(count)
+
+
+if __name__ == '__main__':
+    main()
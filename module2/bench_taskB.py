@@ -0,0 +1,134 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# замеры производительности косого дерева
+# запуск:
+#   python bench_taskB.py memory [количество ключей]
+#   python bench_taskB.py zipf [количество ключей] [количество обращений] [показатель s]
+#   python bench_taskB.py policy [количество ключей] [количество обращений] [показатель s]
+#   python bench_taskB.py snapshot [количество ключей]
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import accumulate
+
+from taskB import SplayTree, TopDownSplayTree, Node
+
+
+# узел с __dict__, как до перехода на __slots__
+class DictNode(Node):
+    pass
+
+
+def bytes_per_key(node_class, count):
+    keys = list(range(count))
+    random.shuffle(keys)
+    tree = SplayTree()
+    tree.node_class = node_class
+    tracemalloc.start()
+    for key in keys:
+        tree.add(key, 'v')
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / count
+
+
+def bench_memory(count):
+    print(f'keys: {count}')
+    for node_class in DictNode, Node:
+        print(f'{node_class.__name__:8} {bytes_per_key(node_class, count):8.1f} bytes/key')
+
+
+# обращения к ключам с вероятностью, обратно пропорциональной рангу ключа в степени s
+def zipf_keys(count, operations, exponent):
+    keys = list(range(count))
+    random.shuffle(keys)
+    weights = list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+    return random.choices(keys, cum_weights=weights, k=operations)
+
+
+def bench_zipf(count, operations, exponent):
+    keys = list(range(count))
+    random.shuffle(keys)
+    accesses = zipf_keys(count, operations, exponent)
+    print(f'keys: {count}, accesses: {operations}, s: {exponent}')
+    for tree_class in SplayTree, TopDownSplayTree:
+        tree = tree_class()
+        for key in keys:
+            tree.add(key, 'v')
+        start = time.perf_counter()
+        for key in accesses:
+            tree.search(key)
+        elapsed = time.perf_counter() - start
+        print(f'{tree_class.__name__:16} {operations / elapsed:12.0f} ops/s')
+
+
+POLICIES = {
+    'full': {},
+    'semi': {'semi': True},
+    'depth > 16': {'depth_threshold': 16},
+    'every 8th': {'period': 8},
+    'semi, depth > 16': {'semi': True, 'depth_threshold': 16},
+}
+
+
+def bench_policy(count, operations, exponent):
+    keys = list(range(count))
+    random.shuffle(keys)
+    accesses = zipf_keys(count, operations, exponent)
+    print(f'keys: {count}, accesses: {operations}, s: {exponent}')
+    for name, policy in POLICIES.items():
+        tree = SplayTree(**policy)
+        for key in keys:
+            tree.add(key, 'v')
+        tree.rotations = tree.operations = 0
+        start = time.perf_counter()
+        for key in accesses:
+            tree.search(key)
+        elapsed = time.perf_counter() - start
+        print(f'{name:18} {operations / elapsed:12.0f} ops/s {tree.rotations_per_operation():8.2f} rotations/op')
+
+
+# холодный старт: повтор всех add против загрузки снимка с разделом формы и без него
+def bench_snapshot(count):
+    keys = list(range(count))
+    random.shuffle(keys)
+    print(f'keys: {count}')
+    for tree_class in SplayTree, TopDownSplayTree:
+        start = time.perf_counter()
+        tree = tree_class()
+        for key in keys:
+            tree.add(key, f'value{key}')
+        print(f'{tree_class.__name__:16} replay add:     {time.perf_counter() - start:8.2f} s')
+        for shape in True, False:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'tree.bin')
+                start = time.perf_counter()
+                tree.dump(path, shape)
+                dump_time = time.perf_counter() - start
+                start = time.perf_counter()
+                tree_class().load(path)
+                load_time = time.perf_counter() - start
+                size = os.path.getsize(path)
+            label = 'with shape' if shape else 'no shape'
+            print(f'{tree_class.__name__:16} {label:10} dump: {dump_time:8.2f} s, load: {load_time:8.2f} s, '
+                  f'{size / count:6.1f} bytes/key')
+
+
+def main():
+    random.seed(0)
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'memory'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 5
+    if mode == 'memory':
+        bench_memory(count)
+    elif mode in ('zipf', 'policy'):
+        operations = int(sys.argv[3]) if len(sys.argv) > 3 else 10 ** 6
+        exponent = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+        (bench_zipf if mode == 'zipf' else bench_policy)(count, operations, exponent)
+    elif mode == 'snapshot':
+        bench_snapshot(count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# замеры производительности кучи
+# запуск:
+#   python bench_taskC.py ends [размер кучи] [количество операций]
+#   python bench_taskC.py bulk [размер кучи] [k]
+#   python bench_taskC.py arity [размеры куч...]
+#   python bench_taskC.py paths [количество вершин] [количество ребер]
+#   python bench_taskC.py storage [размер кучи] [количество операций]
+import random
+import sys
+import time
+import tracemalloc
+
+from paths import WeightedGraph, shortest_paths, minimum_spanning_tree
+from taskC import MinHeap, MinMaxHeap, ArrayHeap
+
+
+ARITIES = [2, 4, 8]
+ARITY_SIZES = [10 ** 4, 10 ** 5, 10 ** 6]
+ARITY_OPERATIONS = 10 ** 5
+
+
+# ключ, считающий сравнения; куча сравнивает ключи только через <
+class CountedKey(int):
+    comparisons = 0
+
+    def __lt__(self, other):
+        CountedKey.comparisons += 1
+        return int.__lt__(self, other)
+
+
+class CountingHeap(MinHeap):
+    def __init__(self, arity=2):
+        super().__init__(arity)
+        self.swaps = 0
+
+    def _swap(self, i, j):
+        self.swaps += 1
+        super()._swap(i, j)
+
+
+def filled(heap_class, keys):
+    heap = heap_class()
+    for key in keys:
+        heap.add(key, 'v')
+    return heap
+
+
+# обращения к обоим концам очереди: max и чередование extract_min / extract_max с добавлением
+def bench_ends(size, operations):
+    keys = random.sample(range(10 * size), size)
+    extra = random.sample(range(10 * size, 20 * size), operations)
+    print(f'heap size: {size}, operations: {operations}')
+    for heap_class in MinHeap, MinMaxHeap:
+        heap = filled(heap_class, keys)
+        start = time.perf_counter()
+        for _ in range(operations):
+            heap.max()
+        max_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, key in enumerate(extra):
+            heap.add(key, 'v')
+            if i % 2:
+                heap.extract_max()
+            else:
+                heap.extract_min()
+        mixed_time = time.perf_counter() - start
+        print(f'{heap_class.__name__:10} max: {operations / max_time:12.0f} ops/s, '
+              f'add + extract: {operations / mixed_time:12.0f} ops/s')
+
+
+# Загрузка пакетом против add по одному и top-k с удалением и без. На случайных ключах add в среднем поднимает
+# элемент на O(1) уровней, поэтому отдельно замеряются ключи по убыванию, где каждый add доходит до корня
+def bench_bulk(size, k):
+    keys = random.sample(range(10 * size), size)
+    orders = {'random': keys, 'descending': sorted(keys, reverse=True)}
+    print(f'heap size: {size}, k: {k}')
+    for heap_class in MinHeap, MinMaxHeap:
+        for order, order_keys in orders.items():
+            items = [(key, 'v') for key in order_keys]
+            start = time.perf_counter()
+            heap = heap_class()
+            for key, value in items:
+                heap.add(key, value)
+            add_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            heap = heap_class()
+            heap.add_many(items)
+            add_many_time = time.perf_counter() - start
+            print(f'{heap_class.__name__:10} {order:10} add: {add_time:6.2f} s, add_many: {add_many_time:6.2f} s')
+
+        start = time.perf_counter()
+        top = heap.peek_k(k)
+        peek_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        assert heap.extract_many(k) == top
+        extract_time = time.perf_counter() - start
+        print(f'{heap_class.__name__:10} peek_k: {peek_time * 1e3:8.2f} ms, extract_many: {extract_time * 1e3:8.2f} ms')
+
+
+# каждая операция - add нового ключа, затем по очереди extract_min или delete случайного ключа
+def run_operations(heap, keys, victims, key_class):
+    for i, (key, victim) in enumerate(zip(keys, victims)):
+        heap.add(key_class(key), 'v')
+        if i % 2:
+            heap.extract_min()
+        elif victim in heap.index_map:
+            heap.delete(victim)
+
+
+def bench_arity(size):
+    initial = random.sample(range(10 * size), size)
+    keys = random.sample(range(10 * size, 20 * size), ARITY_OPERATIONS)
+    victims = random.choices(initial, k=ARITY_OPERATIONS)
+    print(f'heap size: {size}, operations: {ARITY_OPERATIONS}')
+    for arity in ARITIES:
+        heap = CountingHeap(arity)
+        heap.add_many((CountedKey(key), 'v') for key in initial)
+        heap.swaps = CountedKey.comparisons = 0
+        run_operations(heap, keys, victims, CountedKey)
+        comparisons, swaps = CountedKey.comparisons, heap.swaps
+
+        heap = MinHeap(arity)
+        heap.add_many((key, 'v') for key in initial)
+        start = time.perf_counter()
+        run_operations(heap, keys, victims, int)
+        elapsed = time.perf_counter() - start
+        print(f'arity {arity}: {comparisons / ARITY_OPERATIONS:8.1f} comparisons/op, '
+              f'{swaps / ARITY_OPERATIONS:8.1f} swaps/op, {elapsed / ARITY_OPERATIONS * 1e6:8.2f} us/op')
+
+
+PATH_HEAPS = {
+    'binary': lambda: MinHeap(2),
+    '4-ary': lambda: MinHeap(4),
+    '8-ary': lambda: MinHeap(8),
+    'min-max': MinMaxHeap,
+    'arrays': ArrayHeap,
+}
+
+
+# Дейкстра и Прим на случайном связном неориентированном графе с весами от 1 до 100
+def bench_paths(vertices, edges):
+    names = [str(i) for i in range(vertices)]
+    edge_list = [(names[i], names[random.randrange(i)], random.randint(1, 100)) for i in range(1, vertices)]
+    edge_list += [(random.choice(names), random.choice(names), random.randint(1, 100))
+                  for _ in range(edges - len(edge_list))]
+    graph = WeightedGraph(edge_list, False)
+    print(f'vertices: {vertices}, edges: {len(edge_list)}')
+    for name, make_heap in PATH_HEAPS.items():
+        start = time.perf_counter()
+        for _ in shortest_paths(graph, names[0], make_heap()):
+            pass
+        dijkstra_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in minimum_spanning_tree(graph, names[0], make_heap()):
+            pass
+        prim_time = time.perf_counter() - start
+        print(f'{name:8} dijkstra: {dijkstra_time:6.2f} s, prim: {prim_time:6.2f} s')
+
+
+# Память и скорость хранения парами и параллельными массивами. Ключи создаются внутри замера: умножение
+# на нечетное число по модулю 2 ** 32 перемешивает номера без повторов
+def bench_storage(size, operations):
+    print(f'heap size: {size}, operations: {operations}')
+    for heap_class in MinHeap, ArrayHeap:
+        tracemalloc.start()
+        heap = heap_class()
+        heap.add_many((i * 2654435761 % 2 ** 32, 'v') for i in range(size))
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for i in range(operations):
+            heap.add(2 ** 32 + i, 'v')
+            heap.extract_min()
+        elapsed = time.perf_counter() - start
+        print(f'{heap_class.__name__:10} {used / size:8.1f} bytes/entry, '
+              f'add + extract_min: {operations / elapsed:10.0f} pairs/s')
+        del heap
+
+
+def main():
+    random.seed(0)
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'ends'
+    if mode == 'ends':
+        size = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 5
+        operations = int(sys.argv[3]) if len(sys.argv) > 3 else 10 ** 3
+        bench_ends(size, operations)
+    elif mode == 'bulk':
+        size = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 6
+        k = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+        bench_bulk(size, k)
+    elif mode == 'arity':
+        for size in [int(x) for x in sys.argv[2:]] or ARITY_SIZES:
+            bench_arity(size)
+    elif mode == 'paths':
+        vertices = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 5
+        edges = int(sys.argv[3]) if len(sys.argv) > 3 else 10 ** 6
+        bench_paths(vertices, edges)
+    elif mode == 'storage':
+        size = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 7
+        operations = int(sys.argv[3]) if len(sys.argv) > 3 else 10 ** 5
+        bench_storage(size, operations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# Кратчайшие пути (Дейкстра) и минимальное остовное дерево (Прим) на куче из taskC с change_key.
+# Вход в формате module1/taskC: первая непустая строка - тип графа (u - неориентированный), начальная вершина
+# и третье поле, которое здесь не используется; далее ребра "u v" или "u v вес", вес по умолчанию 1.
+# запуск: python paths.py [--prim] [--min-max | --arrays] [--arity N] < граф
+# Дейкстра выводит "вершина расстояние" в порядке окончательной обработки вершин,
+# Прим - ребра дерева "родитель вершина вес" в порядке добавления вершин
+import sys
+
+from taskC import MinHeap, MinMaxHeap, ArrayHeap
+
+CHUNK_SIZE = 1 << 16
+
+
+# Списки смежности adjacency[i] - пары (номер соседа, вес). Номера вершин выдаются в порядке имен,
+# поэтому при равных приоритетах вершины извлекаются из кучи в порядке имен
+class WeightedGraph:
+    def __init__(self, edges, directed):
+        edges = list(edges)
+        self.names = sorted({name for u, v, _ in edges for name in (u, v)})
+        self.ids = {name: vertex_id for vertex_id, name in enumerate(self.names)}
+        self.adjacency = [[] for _ in self.names]
+        for u, v, weight in edges:
+            if weight < 0:
+                raise ValueError()
+            self.adjacency[self.ids[u]].append((self.ids[v], weight))
+            if not directed:
+                self.adjacency[self.ids[v]].append((self.ids[u], weight))
+
+
+# построчное чтение ребер блоками примерно по chunk_size символов, пустые строки пропускаются
+def read_edges(input_stream, chunk_size=CHUNK_SIZE):
+    while True:
+        lines = input_stream.readlines(chunk_size)
+        if not lines:
+            return
+        for line in lines:
+            edge = line.split()
+            if edge:
+                u, v, *weight = edge
+                yield u, v, int(weight[0]) if weight else 1
+
+
+# Общая часть алгоритмов Дейкстры и Прима: в куче лежат еще не обработанные вершины с ключом
+# priority * n + номер вершины, так что ключи уникальны, а приоритет улучшается через change_key.
+# relax(priority, weight) - новый приоритет соседа по ребру веса weight. Выдает (номер, приоритет, родитель)
+def _best_first(graph, start, relax, heap):
+    n = len(graph.names)
+    source = graph.ids[start]
+    keys = {source: source}  # текущие ключи вершин, которые сейчас в куче
+    parents = {source: None}
+    done = bytearray(n)
+    heap.add(source, source)
+    while heap:
+        key, vertex = heap.extract_min()
+        del keys[vertex]
+        done[vertex] = 1
+        priority = key // n
+        yield vertex, priority, parents[vertex]
+        for neighbor, weight in graph.adjacency[vertex]:
+            if done[neighbor]:
+                continue
+            new_key = relax(priority, weight) * n + neighbor
+            if neighbor not in keys:
+                heap.add(new_key, neighbor)
+            elif new_key < keys[neighbor]:
+                heap.change_key(keys[neighbor], new_key)
+            else:
+                continue
+            keys[neighbor] = new_key
+            parents[neighbor] = vertex
+
+
+# пары (вершина, расстояние от start); если start нет в графе, выдается только (start, 0)
+def shortest_paths(graph, start, heap=None):
+    if start not in graph.ids:
+        yield start, 0
+        return
+    for vertex, distance, _ in _best_first(graph, start, lambda distance, weight: distance + weight,
+                                           MinHeap() if heap is None else heap):
+        yield graph.names[vertex], distance
+
+
+# ребра (родитель, вершина, вес) минимального остовного дерева компоненты start неориентированного графа
+def minimum_spanning_tree(graph, start, heap=None):
+    if start not in graph.ids:
+        return
+    for vertex, weight, parent in _best_first(graph, start, lambda _, weight: weight,
+                                              MinHeap() if heap is None else heap):
+        if parent is not None:
+            yield graph.names[parent], graph.names[vertex], weight
+
+
+def main():
+    header = ''
+    for header in sys.stdin:
+        if header.strip():
+            break
+    graph_type, start_vertex, *_ = header.split()
+    graph = WeightedGraph(read_edges(sys.stdin), graph_type != 'u')
+
+    arity = int(sys.argv[sys.argv.index('--arity') + 1]) if '--arity' in sys.argv else 2
+    if '--min-max' in sys.argv[1:]:
+        heap = MinMaxHeap()
+    elif '--arrays' in sys.argv[1:]:
+        heap = ArrayHeap(arity)
+    else:
+        heap = MinHeap(arity)
+    if '--prim' in sys.argv[1:]:
+        sys.stdout.writelines(f'{parent} {vertex} {weight}\n'
+                              for parent, vertex, weight in minimum_spanning_tree(graph, start_vertex, heap))
+    else:
+        sys.stdout.writelines(f'{vertex} {distance}\n' for vertex, distance in shortest_paths(graph, start_vertex, heap))
+
+
+if __name__ == '__main__':
+    main()
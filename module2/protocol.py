@@ -0,0 +1,111 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# общий разбор команд для taskA, taskB и taskC: команда определяется по первому слову,
+# строка разбирается один раз, ответы копятся в буфере и выводятся блоками
+import sys
+
+OUTPUT_BLOCK = 1 << 16
+
+# форматы аргументов команд
+NO_ARGS = 0     # ^command$
+KEY = 1         # ^command\s+(-?\d+)$
+KEY_VALUE = 2   # ^command\s+(-?\d+)\s+(.*)$
+
+
+class Output:
+    def __init__(self, output_stream, block_size=OUTPUT_BLOCK):
+        self.output_stream = output_stream
+        self.block_size = block_size
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.block_size:
+            self.flush()
+
+    def line(self, text):
+        self.write(text + '\n')
+
+    def flush(self):
+        self.output_stream.write(''.join(self.parts))
+        self.parts.clear()
+        self.size = 0
+
+
+# \d в регулярных выражениях - это str.isdecimal, \s - str.isspace, поэтому и int(), и split() принимают то же самое
+def _is_key(token):
+    return (token[1:] if token[:1] == '-' else token).isdecimal()
+
+
+# Разбор строки с теми же правилами, что у регулярных выражений из комментариев к форматам:
+# перевод строки в конце допускается всегда, а для KEY_VALUE он же может служить пробелом перед пустым значением.
+# Возвращает (обработчик, аргументы) или None для ошибочной строки
+def parse(line, commands):
+    parts = line.split(None, 2)
+    if not parts or line[0].isspace() or parts[0] not in commands:
+        return None
+    arity, handler = commands[parts[0]]
+    if arity == NO_ARGS:
+        if line == parts[0] or line == parts[0] + '\n':
+            return handler, ()
+        return None
+    if len(parts) < 2 or not _is_key(parts[1]):
+        return None
+    key = int(parts[1])
+    if arity == KEY:
+        body = line[:-1] if line[-1] == '\n' else line
+        if len(parts) == 2 and not body[-1].isspace():
+            return handler, (key,)
+        return None
+    if len(parts) == 3:
+        value = parts[2]
+        return handler, (key, value[:-1] if value[-1] == '\n' else value)
+    if line[-1].isspace():
+        return handler, (key, '')
+    return None
+
+
+# commands: {команда: (формат, обработчик)}, обработчик получает Output и аргументы команды.
+# На ошибочную строку и на ValueError из обработчика выводится error. skip_blank - пропускать пустые строки
+def run(lines, commands, output_stream=sys.stdout, skip_blank=False):
+    output = Output(output_stream)
+    for line in lines:
+        if skip_blank and not line.strip():
+            continue
+        parsed = parse(line, commands)
+        if parsed is None:
+            output.line('error')
+            continue
+        handler, args = parsed
+        try:
+            handler(output, *args)
+        except ValueError:
+            output.line('error')
+    output.flush()
+
+
+# Обработчики команд протокола для дерева поиска tree из taskA или taskB. Деревья различаются только выводом,
+# поэтому print_tree(output) - обработчик команды print
+def tree_commands(tree, print_tree):
+    def search(output, key):
+        node = tree.search(key)
+        output.line(f"1 {node.value}" if node else "0")
+
+    def find_min(output):
+        node = tree.find_min()
+        output.line(f"{node.key} {node.value}")
+
+    def find_max(output):
+        node = tree.find_max()
+        output.line(f"{node.key} {node.value}")
+
+    return {
+        'add': (KEY_VALUE, lambda output, key, value: tree.add(key, value)),
+        'set': (KEY_VALUE, lambda output, key, value: tree.set(key, value)),
+        'search': (KEY, search),
+        'min': (NO_ARGS, find_min),
+        'max': (NO_ARGS, find_max),
+        'delete': (KEY, lambda output, key: tree.delete(key)),
+        'print': (NO_ARGS, print_tree),
+    }
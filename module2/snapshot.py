@@ -0,0 +1,144 @@
+# Copyright Boris Ermolovich ermolovich.boris@gmail.com
+# Двоичный снимок дерева поиска (все числа little-endian):
+#   заголовок - MAGIC, флаги (SHAPE - есть раздел формы), количество вершин n;
+#   n записей по возрастанию ключа - ключ int64, длина значения uint32, значение в UTF-8;
+#   раздел формы - n байт, по байту на вершину в прямом порядке обхода: бит LEFT - есть левый ребенок,
+#   бит RIGHT - есть правый. Ключи в форму расставляются симметричным обходом
+import mmap
+import struct
+
+MAGIC = b'TRE1'
+SHAPE = 1
+LEFT = 1
+RIGHT = 2
+HEADER = struct.Struct('<4sBQ')
+RECORD = struct.Struct('<qI')
+
+
+def _in_order(root):
+    stack = []
+    node = root
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node
+        node = node.right
+
+
+def _pre_order(root):
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+
+
+# Запись снимка дерева с корнем root в файл path; shape - добавить раздел формы.
+# Количество вершин заранее неизвестно, поэтому заголовок дописывается после записей
+def write(root, path, shape=False):
+    with open(path, 'wb') as output_file:
+        output_file.write(HEADER.pack(MAGIC, 0, 0))
+        count = 0
+        for node in _in_order(root):
+            value = node.value.encode()
+            output_file.write(RECORD.pack(node.key, len(value)))
+            output_file.write(value)
+            count += 1
+        if shape:
+            output_file.write(bytes((node.left is not None) * LEFT | (node.right is not None) * RIGHT
+                                    for node in _pre_order(root)))
+        output_file.seek(0)
+        output_file.write(HEADER.pack(MAGIC, SHAPE if shape else 0, count))
+
+
+# Чтение снимка через mmap: список пар (ключ, значение) и раздел формы (None, если его нет).
+# Поврежденный файл - ValueError
+def read(path):
+    with open(path, 'rb') as input_file, mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        try:
+            magic, flags, count = HEADER.unpack_from(data)
+            if magic != MAGIC:
+                raise ValueError()
+            items = []
+            offset = HEADER.size
+            for _ in range(count):
+                key, length = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                if offset + length > len(data):
+                    raise ValueError()
+                items.append((key, data[offset:offset + length].decode()))
+                offset += length
+        except struct.error:
+            raise ValueError()
+        shape = None
+        if flags & SHAPE:
+            shape = data[offset:offset + count]
+            offset += count
+        if offset != len(data) or (shape is not None and len(shape) != count):
+            raise ValueError()
+    return items, shape
+
+
+# форма идеально сбалансированного дерева из count вершин, лишняя вершина уходит влево, как в BST.bulk_load
+def balanced_shape(count):
+    shape = bytearray()
+    stack = [count]
+    while stack:
+        size = stack.pop()
+        if size == 0:
+            continue
+        left = size // 2
+        right = size - left - 1
+        shape.append((left > 0) * LEFT | (right > 0) * RIGHT)
+        stack.append(right)
+        stack.append(left)
+    return bytes(shape)
+
+
+# Дерево из вершин node_class за O(n): items - пары по строго возрастающему ключу, shape - раздел формы
+# (None - сбалансированная форма). Если у вершин есть указатель parent, он заполняется. Возвращает корень
+def build(items, shape, node_class):
+    for i in range(1, len(items)):
+        if not items[i - 1][0] < items[i][0]:
+            raise ValueError()
+    if shape is None:
+        shape = balanced_shape(len(items))
+    if len(shape) != len(items):
+        raise ValueError()
+
+    root = parent = None
+    side = LEFT
+    waiting = []  # вершины, чей правый ребенок еще не построен
+    for position, flags in enumerate(shape):
+        node = node_class(None, None)
+        if position == 0:
+            root = node
+            with_parent = hasattr(node, 'parent')
+        elif parent is None:
+            raise ValueError()
+        elif side == LEFT:
+            parent.left = node
+        else:
+            parent.right = node
+        if with_parent:
+            node.parent = parent
+        if flags & LEFT:
+            if flags & RIGHT:
+                waiting.append(node)
+            parent, side = node, LEFT
+        elif flags & RIGHT:
+            parent, side = node, RIGHT
+        else:
+            parent, side = (waiting.pop(), RIGHT) if waiting else (None, LEFT)
+    if parent is not None:
+        raise ValueError()
+
+    for node, (key, value) in zip(_in_order(root), items):
+        node.key = key
+        node.value = value
+    return root
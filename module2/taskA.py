@@ -1,16 +1,23 @@
 # Copyright Boris Ermolovich ermolovich.boris@gmail.com
 # двоичное дерево поиска
 import sys
-import re
+
+import snapshot
+from protocol import run, tree_commands
+
+RUN_BLOCK = 1 << 12
 
 
 class Node:
+    __slots__ = ('key', 'value', 'left', 'right', 'parent', 'size')
+
     def __init__(self, key, value, left=None, right=None, parent=None):
         self.key = key
         self.value = value
         self.left = left
         self.right = right
         self.parent = parent
+        self.size = 1  # количество вершин в поддереве
 
     def has_both_children(self):
         return self.left and self.right
@@ -26,53 +33,99 @@ class Node:
 
 
 class BST: # Binary Search Tree
+    node_class = Node
+
     def __init__(self):
         self.root = None
 
+    @staticmethod
+    def _size(node):
+        return node.size if node is not None else 0
+
+    # изменение размеров поддеревьев на пути от node до корня
+    @staticmethod
+    def _resize_path(node, delta):
+        while node is not None:
+            node.size += delta
+            node = node.parent
+
     def search(self, key, current_node=None):
-        if self.root is None:
-            return None
+        current_node = self.root if current_node is None else current_node
+        while current_node is not None and current_node.key != key:
+            current_node = current_node.left if key < current_node.key else current_node.right
+        return current_node
+
+    def _replace_child(self, parent, old, new):
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
         else:
-            if current_node is None:
-                current_node = self.root
-            if key < current_node.key:
-                return self.search(key, current_node.left) if current_node.has_left_child() else None
-            elif key > current_node.key:
-                return self.search(key, current_node.right) if current_node.has_right_child() else None
-            else:
-                return current_node
+            parent.right = new
 
-    def _put(self, key, value, current_node=None):
-        if self.root is None:
-            self.root = Node(key, value)
+    # точки расширения для наследников, поддерживающих дополнительные поля узлов
+    def _after_insert(self, node):
+        pass
+
+    def _after_remove(self, parent):
+        pass
+
+    def _after_load(self, node, size):
+        pass
+
+    # вставка за один проход по дереву; False, если ключ уже есть
+    def insert(self, key, value):
+        parent = None
+        current_node = self.root
+        while current_node is not None:
+            if key == current_node.key:
+                return False
+            parent = current_node
+            current_node = current_node.left if key < current_node.key else current_node.right
+        new_node = self.node_class(key, value, parent=parent)
+        if parent is None:
+            self.root = new_node
+        elif key < parent.key:
+            parent.left = new_node
         else:
-            if current_node is None:
-                current_node = self.root
-
-            if key < current_node.key:
-                if current_node.has_left_child():
-                    self._put(key, value, current_node.left)
-                else:
-                    current_node.left = Node(key, value, parent=current_node)
-            elif key > current_node.key:
-                if current_node.has_right_child():
-                    self._put(key, value, current_node.right)
-                else:
-                    current_node.right = Node(key, value, parent=current_node)
-            else:
-                current_node.value = value
+            parent.right = new_node
+        self._resize_path(parent, 1)
+        self._after_insert(new_node)
+        return True
+
+    # замена значения; False, если ключа нет
+    def update(self, key, value):
+        node = self.search(key)
+        if node is None:
+            return False
+        node.value = value
+        return True
+
+    # удаление за один проход; вершина с двумя детьми получает ключ и значение максимума левого поддерева,
+    # а вырезается сам максимум. False, если ключа нет
+    def remove(self, key):
+        node = self.search(key)
+        if node is None:
+            return False
+        if node.has_both_children():
+            max_in_left = self.find_max(node.left)
+            node.key = max_in_left.key
+            node.value = max_in_left.value
+            node = max_in_left
+        child = node.left if node.has_left_child() else node.right
+        if child is not None:
+            child.parent = node.parent
+        self._replace_child(node.parent, node, child)
+        self._resize_path(node.parent, -1)
+        self._after_remove(node.parent)
+        return True
 
     def add(self, key, value):
-        if self.search(key) is not None:
+        if not self.insert(key, value):
             raise ValueError()
-        else:
-            self._put(key, value)
-
 
     def set(self, key, value):
-        if self.search(key) is not None:
-            self._put(key, value)
-        else:
+        if not self.update(key, value):
             raise ValueError()
 
     def find_min(self, current_node=None):
@@ -93,113 +146,240 @@ class BST: # Binary Search Tree
                 current_node = current_node.right
             return current_node
 
-    def _remove(self, key, current_node):
-        if key < current_node.key:
-            current_node.left = self._remove(key, current_node.left)
-        elif key > current_node.key:
-            current_node.right = self._remove(key, current_node.right)
-        else:
-            if not current_node.has_any_children():
-                if current_node == self.root:
-                    self.root = None
-                return None
-            elif not current_node.has_both_children():
-                if current_node.has_left_child():
-                    temp = current_node.left
-                else:
-                    temp = current_node.right
-                temp.parent = current_node.parent
-                if current_node == self.root:
-                    self.root = temp
-                return temp
+    def delete(self, key):
+        if not self.remove(key):
+            raise ValueError('error')
+
+    # Построение идеально сбалансированного дерева за O(n) из пар (ключ, значение),
+    # упорядоченных по строго возрастающему ключу. Прежнее содержимое дерева заменяется.
+    # При четном числе вершин в поддереве лишняя уходит влево
+    def bulk_load(self, items):
+        items = list(items)
+        for i in range(1, len(items)):
+            if not items[i - 1][0] < items[i][0]:
+                raise ValueError()
+        self.root = None
+        stack = [(0, len(items), None)]
+        while stack:
+            start, end, parent = stack.pop()
+            if start == end:
+                continue
+            middle = (start + end) // 2
+            key, value = items[middle]
+            node = self.node_class(key, value, parent=parent)
+            if parent is None:
+                self.root = node
+            elif key < parent.key:
+                parent.left = node
             else:
-                max_in_left = self.find_max(current_node.left)
-                current_node.key = max_in_left.key
-                current_node.value = max_in_left.value
-                current_node.left = self._remove(max_in_left.key, current_node.left)
+                parent.right = node
+            node.size = end - start
+            self._after_load(node, end - start)
+            stack.append((middle + 1, end, node))
+            stack.append((start, middle, node))
 
-        return current_node
+    # снимок дерева в файл path (без раздела формы)
+    def dump(self, path):
+        snapshot.write(self.root, path)
 
-    def delete(self, key):
-        if not self.root:
-            raise ValueError('error')
-        if self.search(key) is not None:
-            self._remove(key, self.root)
-        else:
-            raise ValueError('error')
+    # замена содержимого идеально сбалансированным деревом из снимка через bulk_load; раздел формы,
+    # если он есть, не используется, так как произвольная форма может нарушать баланс AVLTree
+    def load(self, path):
+        items, _ = snapshot.read(path)
+        self.bulk_load(items)
 
-    # output_handler функция, принимающая на вход строку и реализующая ее вывод (по умолчанию в консоль)
-    def output_tree(self, output_handler=print):
+    # k-я по возрастанию вершина, k считается с нуля
+    def select(self, k):
+        if not 0 <= k < self._size(self.root):
+            raise ValueError()
+        current_node = self.root
+        while True:
+            left_size = self._size(current_node.left)
+            if k < left_size:
+                current_node = current_node.left
+            elif k > left_size:
+                k -= left_size + 1
+                current_node = current_node.right
+            else:
+                return current_node
+
+    # количество ключей меньше key (или не больше key при inclusive=True)
+    def rank(self, key, inclusive=False):
+        result = 0
+        current_node = self.root
+        while current_node is not None:
+            if key < current_node.key or (key == current_node.key and not inclusive):
+                current_node = current_node.left
+            else:
+                result += self._size(current_node.left) + 1
+                current_node = current_node.right
+        return result
+
+    # количество ключей в отрезке [a, b]
+    def count_range(self, a, b):
+        if b < a:
+            return 0
+        return self.rank(b, inclusive=True) - self.rank(a)
+
+    # ленивый симметричный обход вершин с ключами из отрезка [a, b] за O(log n + размер ответа)
+    def range(self, a, b):
+        stack = []
+        current_node = self.root
+        while current_node is not None:
+            if current_node.key < a:
+                current_node = current_node.right
+            else:
+                stack.append(current_node)
+                current_node = current_node.left
+        while stack:
+            node = stack.pop()
+            if b < node.key:
+                return
+            yield node
+            current_node = node.right
+            while current_node is not None:
+                stack.append(current_node)
+                current_node = current_node.left
+
+    # Уровни дерева для вывода: каждый уровень - генератор кусков строки. Хранятся только настоящие вершины
+    # с их позициями на уровне, серии "_" между ними выдаются кусками не длиннее RUN_BLOCK элементов
+    def levels(self):
         if self.root is None:
-            output_handler("_")
+            yield iter(["_"])
             return
 
-        current_level = [self.root]
+        current_level = [(0, self.root)]
+        width = 1
         while current_level:
             next_level = []
-            result_line = []
-            for node in current_level:
-                if node is None:
-                    result_line.append("_")
-                    next_level.append(None)
-                    next_level.append(None)
-                else:
-                    parent_key = node.parent.key if node.parent is not None else None
-                    result_line.append(f"[{node.key} {node.value} {parent_key}]" if parent_key is not None else
-                                       f"[{node.key} {node.value}]")
-                    next_level.append(node.left)
-                    next_level.append(node.right)
-
-            if any(n is not None for n in current_level):
-                output_handler(" ".join(result_line))
-            else:
-                return
+            for position, node in current_level:
+                if node.left is not None:
+                    next_level.append((2 * position, node.left))
+                if node.right is not None:
+                    next_level.append((2 * position + 1, node.right))
+            yield self._level_chunks(current_level, width)
             current_level = next_level
+            width *= 2
 
+    @staticmethod
+    def _gap_chunks(start, end):
+        if start < end and start == 0:
+            yield "_"
+            start += 1
+        while start < end:
+            count = min(end - start, RUN_BLOCK)
+            yield " _" * count
+            start += count
 
-def main():
-    binary_tree = BST()
-
-    for line in sys.stdin:
-        add_match = re.match(r"^add\s+(-?\d+)\s+(.*)$", line)
-        set_match = re.match(r"^set\s+(-?\d+)\s+(.*)$", line)
-        search_match = re.match(r"^search\s+(-?\d+)$", line)
-        find_min_match = re.match(r"^min$", line)
-        find_max_match = re.match(r"^max$", line)
-        delete_match = re.match(r"^delete\s+(-?\d+)$", line)
-        print_match = re.match(r"^print$", line)
-
-        try:
-            if add_match:
-                key = int(add_match.group(1))
-                value = add_match.group(2)
-                binary_tree.add(key, value)
-            elif set_match:
-                key = int(set_match.group(1))
-                value = set_match.group(2)
-                binary_tree.set(key, value)
-            elif search_match:
-                key = int(search_match.group(1))
-                node = binary_tree.search(key)
-                if node:
-                    print(f"1 {node.value}")
-                else:
-                    print("0")
-            elif find_min_match:
-                node = binary_tree.find_min()
-                print(f"{node.key} {node.value}")
-            elif find_max_match:
-                node = binary_tree.find_max()
-                print(f"{node.key} {node.value}")
-            elif delete_match:
-                key = int(delete_match.group(1))
-                binary_tree.delete(key)
-            elif print_match:
-                binary_tree.output_tree()
+    def _level_chunks(self, level, width):
+        previous = 0
+        for position, node in level:
+            yield from self._gap_chunks(previous, position)
+            separator = " " if position else ""
+            if node.parent is not None:
+                yield f"{separator}[{node.key} {node.value} {node.parent.key}]"
             else:
-                print("error")
-        except ValueError:
-            print("error")
+                yield f"{separator}[{node.key} {node.value}]"
+            previous = position + 1
+        yield from self._gap_chunks(previous, width)
+
+    # output_handler функция, принимающая на вход строку и реализующая ее вывод (по умолчанию в консоль)
+    def output_tree(self, output_handler=print):
+        for chunks in self.levels():
+            output_handler("".join(chunks))
+
+    # вывод без сборки строк целиком: write получает куски строк, например sys.stdout.write
+    def write_tree(self, write):
+        for chunks in self.levels():
+            for chunk in chunks:
+                write(chunk)
+            write("\n")
+
+
+class AVLNode(Node):
+    __slots__ = ('height',)
+
+    def __init__(self, key, value, left=None, right=None, parent=None):
+        super().__init__(key, value, left, right, parent)
+        self.height = 1
+
+
+# АВЛ-дерево с тем же интерфейсом и теми же ошибками, что у BST. Все операции итеративные,
+# высота дерева O(log n), поэтому упорядоченные потоки ключей не вырождают его в список
+class AVLTree(BST):
+    node_class = AVLNode
+
+    @staticmethod
+    def _height(node):
+        return node.height if node is not None else 0
+
+    def _update(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        node.size = 1 + self._size(node.left) + self._size(node.right)
+
+    def _balance(self, node):
+        return self._height(node.left) - self._height(node.right)
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        if pivot.left is not None:
+            pivot.left.parent = node
+        pivot.parent = node.parent
+        self._replace_child(node.parent, node, pivot)
+        pivot.left = node
+        node.parent = pivot
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        if pivot.right is not None:
+            pivot.right.parent = node
+        pivot.parent = node.parent
+        self._replace_child(node.parent, node, pivot)
+        pivot.right = node
+        node.parent = pivot
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    # восстановление баланса на пути от node до корня
+    def _rebalance(self, node):
+        while node is not None:
+            self._update(node)
+            balance = self._balance(node)
+            if balance > 1:
+                if self._balance(node.left) < 0:
+                    self._rotate_left(node.left)
+                node = self._rotate_right(node)
+            elif balance < -1:
+                if self._balance(node.right) > 0:
+                    self._rotate_right(node.right)
+                node = self._rotate_left(node)
+            node = node.parent
+
+    def _after_insert(self, node):
+        self._rebalance(node.parent)
+
+    def _after_remove(self, parent):
+        self._rebalance(parent)
+
+    # высота идеально сбалансированного поддерева из size вершин
+    def _after_load(self, node, size):
+        node.height = size.bit_length()
+
+
+# обработчики команд протокола для дерева tree
+def commands(tree):
+    return tree_commands(tree, lambda output: tree.write_tree(output.write))
+
+
+def main():
+    binary_tree = AVLTree() if '--avl' in sys.argv[1:] else BST()
+    run(sys.stdin, commands(binary_tree), sys.stdout)
 
 
 if __name__ == "__main__":
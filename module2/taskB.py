@@ -1,9 +1,14 @@
 # Copyright Boris Ermolovich ermolovich.boris@gmail.com
 # косое дерево
+import math
 import sys
-import re
+
+import snapshot
+from protocol import run, tree_commands
 
 class Node:
+    __slots__ = ('key', 'value', 'left', 'right', 'parent')
+
     def __init__(self, key, value, parent=None, left=None, right=None):
         self.key = key
         self.value = value
@@ -32,13 +37,63 @@ class Node:
         self.parent = None
 
 
-class SplayTree:
-    def __init__(self):
+class TopDownNode:
+    __slots__ = ('key', 'value', 'left', 'right')
+
+    def __init__(self, key, value, left=None, right=None):
+        self.key = key
+        self.value = value
+        self.left = left
+        self.right = right
+
+
+# Общая часть обоих косых деревьев: снимок в файл и вывод. Корень хранится в root, вершины создаются node_class
+class SplayTreeBase:
+    # снимок дерева в файл path; shape - сохранить точную форму, иначе при загрузке дерево будет сбалансированным
+    def dump(self, path, shape=True):
+        snapshot.write(self.root, path, shape)
+
+    # замена содержимого деревом из снимка за O(n), без перестроек
+    def load(self, path):
+        items, shape = snapshot.read(path)
+        self.root = snapshot.build(items, shape, self.node_class)
+
+    # сторонний разработчик должен реализовать функцию output_handler, если необходимо выводить дерево не в консоль
+    def output(self, output_handler=None):
+        if not output_handler:
+            console_output(self)
+        else:
+            output_handler(self)
+
+
+# Политика перестройки при чтении (search, set, find_min, find_max):
+# semi - полускос: в случае zig-zig выполняется один поворот и подъем продолжается от родителя;
+# depth_threshold - перестраивать, только если глубина вершины больше порога;
+# period - перестраивать только при каждом period-м чтении.
+# Значения по умолчанию дают обычное полное скашивание при каждом обращении.
+# rotations и operations - счетчики поворотов и операций
+class SplayTree(SplayTreeBase):
+    node_class = Node
+
+    def __init__(self, semi=False, depth_threshold=0, period=1):
         self.root = None
+        self.semi = semi
+        self.depth_threshold = depth_threshold
+        self.period = period
+        self.reads = 0
+        self.rotations = 0
+        self.operations = 0
+
+    def _new_tree(self):
+        return type(self)(self.semi, self.depth_threshold, self.period)
+
+    def rotations_per_operation(self):
+        return self.rotations / self.operations if self.operations else 0.0
 
     def _rotate_left(self, node):
         right_child = node.right
         if right_child:
+            self.rotations += 1
             node.right = right_child.left
             if right_child.left:
                 right_child.left.parent = node
@@ -55,6 +110,7 @@ class SplayTree:
     def _rotate_right(self, node):
         left_child = node.left
         if left_child:
+            self.rotations += 1
             node.left = left_child.right
             if left_child.right:
                 left_child.right.parent = node
@@ -88,9 +144,51 @@ class SplayTree:
                 self._rotate_left(node.parent)
                 self._rotate_right(node.parent)
 
+    def _semi_splay(self, node):
+        while node and node.parent:
+            if not node.parent.parent:
+                if node.is_left_child():
+                    self._rotate_right(node.parent)
+                else:
+                    self._rotate_left(node.parent)
+            elif node.is_left_child() and node.parent.is_left_child():
+                node = node.parent
+                self._rotate_right(node.parent)
+            elif node.is_right_child() and node.parent.is_right_child():
+                node = node.parent
+                self._rotate_left(node.parent)
+            elif node.is_left_child() and node.parent.is_right_child():
+                self._rotate_right(node.parent)
+                self._rotate_left(node.parent)
+            elif node.is_right_child() and node.parent.is_left_child():
+                self._rotate_left(node.parent)
+                self._rotate_right(node.parent)
+
+    @staticmethod
+    def _depth(node):
+        depth = 0
+        while node.parent:
+            node = node.parent
+            depth += 1
+        return depth
+
+    # перестройка после чтения с учетом политики
+    def _access(self, node):
+        if not node:
+            return
+        self.reads += 1
+        if self.reads % self.period:
+            return
+        if self.depth_threshold and self._depth(node) <= self.depth_threshold:
+            return
+        if self.semi:
+            self._semi_splay(node)
+        else:
+            self._splay(node)
+
     def _put(self, key, value):
         if not self.root:
-            self.root = Node(key, value)
+            self.root = self.node_class(key, value)
             return
 
         current_node = self.root
@@ -107,7 +205,7 @@ class SplayTree:
                 self._splay(current_node)
                 return
 
-        new_node = Node(key, value, parent)
+        new_node = self.node_class(key, value, parent)
         if key < parent.key:
             parent.left = new_node
         else:
@@ -141,6 +239,7 @@ class SplayTree:
         return current_node
 
     def add(self, key, value):
+        self.operations += 1
         node = self._find(key)[0]
         if node:
             self._splay(node)
@@ -148,38 +247,43 @@ class SplayTree:
         self._put(key, value)
 
     def set(self, key, value):
+        self.operations += 1
         node, last_visited = self._find(key)
         if not node:
-            self._splay(last_visited)
+            self._access(last_visited)
             raise ValueError("error")
         node.value = value
-        self._splay(node)
+        self._access(node)
 
     def search(self, key):
+        self.operations += 1
         if not self.root:
             return None
         node, last_visited = self._find(key)
         if not node:
-            self._splay(last_visited)
+            self._access(last_visited)
             return node
-        self._splay(node)
+        self._access(node)
         return node
 
     def find_min(self):
+        self.operations += 1
         if not self.root:
             raise ValueError("error")
         min_node = self._min(self.root)
-        self._splay(min_node)
+        self._access(min_node)
         return min_node
 
     def find_max(self):
+        self.operations += 1
         if not self.root:
             raise ValueError("error")
         max_node = self._max(self.root)
-        self._splay(max_node)
+        self._access(max_node)
         return max_node
 
     def delete(self, key):
+        self.operations += 1
         node, last_visited = self._find(key)
         if not node:
             self._splay(last_visited)
@@ -205,22 +309,199 @@ class SplayTree:
             self.root = None
         node.clear()
 
-    # сторонний разработчик должен реализовать функцию output_handler, если необходимо выводить дерево не в консоль
-    def output(self, output_handler=None):
-        if not output_handler:
-            console_output(self)
+    # Отделение ключей >= key (> key при after=True) в новое дерево, в self остаются меньшие.
+    # Граничная вершина поиска поднимается в корень, после чего дерево разрезается по одной связи
+    def split(self, key, after=False):
+        right = self._new_tree()
+        if not self.root:
+            return right
+        node, last_visited = self._find(key)
+        self._splay(node or last_visited)
+        root = self.root
+        if root.key < key or (after and root.key == key):
+            right.root = root.right
+            root.right = None
         else:
-            output_handler(self)
+            right.root = root
+            self.root = root.left
+            root.left = None
+        for tree in self, right:
+            if tree.root:
+                tree.root.parent = None
+        return right
+
+    # Присоединение дерева right, все ключи которого больше ключей self; right становится пустым
+    def join(self, right):
+        if not right.root:
+            return
+        if not self.root:
+            self.root, right.root = right.root, None
+            return
+        max_node = self._max(self.root)
+        if self._min(right.root).key <= max_node.key:
+            raise ValueError("error")
+        self._splay(max_node)
+        max_node.right = right.root
+        right.root.parent = max_node
+        right.root = None
+
+    # Удаление всех ключей из отрезка [a, b] двумя разрезами и одним соединением.
+    # Возвращает дерево из удаленных вершин
+    def delete_range(self, a, b):
+        if b < a:
+            return self._new_tree()
+        removed = self.split(a)
+        tail = removed.split(b, after=True)
+        self.join(tail)
+        return removed
+
+    # Ленивый обход вершин с ключами из [a, b] по возрастанию: граница a поднимается в корень,
+    # дальше симметричный обход со стеком, O(log n + размер ответа) амортизированно.
+    # Дерево нельзя изменять, пока обход не закончен
+    def range(self, a, b):
+        if not self.root:
+            return
+        node, last_visited = self._find(a)
+        self._splay(node or last_visited)
+        stack = []
+        current_node = self.root
+        while current_node:
+            if current_node.key < a:
+                current_node = current_node.right
+            else:
+                stack.append(current_node)
+                current_node = current_node.left
+        while stack:
+            node = stack.pop()
+            if b < node.key:
+                return
+            yield node
+            current_node = node.right
+            while current_node:
+                stack.append(current_node)
+                current_node = current_node.left
+
+
+# Нисходящее косое дерево: поиск и перестройка выполняются за один проход сверху вниз,
+# узлы не хранят указатель на родителя. Интерфейс и ошибки те же, что у SplayTree,
+# но форма дерева после операций в общем случае отличается от восходящего варианта, поэтому вывод print
+# не совпадает с ожидаемым протоколом, и main этот вариант не использует: он только для библиотечного применения
+class TopDownSplayTree(SplayTreeBase):
+    node_class = TopDownNode
+
+    def __init__(self):
+        self.root = None
+
+    # Вершина с ключом key (или последняя на пути поиска) поднимается в корень. Пройденная часть дерева
+    # раскладывается на левое дерево (ключи меньше key) и правое (больше key), которые собираются в конце.
+    # header.right - корень левого дерева, header.left - корень правого
+    def _splay(self, key):
+        root = self.root
+        if root is None:
+            return
+        header = self.node_class(None, None)
+        left_max = right_min = header
+        while True:
+            if key < root.key:
+                if root.left is None:
+                    break
+                if key < root.left.key:
+                    child = root.left
+                    root.left = child.right
+                    child.right = root
+                    root = child
+                    if root.left is None:
+                        break
+                right_min.left = root
+                right_min = root
+                root = root.left
+            elif key > root.key:
+                if root.right is None:
+                    break
+                if key > root.right.key:
+                    child = root.right
+                    root.right = child.left
+                    child.left = root
+                    root = child
+                    if root.right is None:
+                        break
+                left_max.right = root
+                left_max = root
+                root = root.right
+            else:
+                break
+        left_max.right = root.left
+        right_min.left = root.right
+        root.left = header.right
+        root.right = header.left
+        self.root = root
+
+    def add(self, key, value):
+        self._splay(key)
+        root = self.root
+        if root is not None and root.key == key:
+            raise ValueError("error")
+        new_node = self.node_class(key, value)
+        if root is not None:
+            if key < root.key:
+                new_node.left = root.left
+                new_node.right = root
+                root.left = None
+            else:
+                new_node.right = root.right
+                new_node.left = root
+                root.right = None
+        self.root = new_node
+
+    def set(self, key, value):
+        self._splay(key)
+        if self.root is None or self.root.key != key:
+            raise ValueError("error")
+        self.root.value = value
+
+    def search(self, key):
+        self._splay(key)
+        if self.root is None or self.root.key != key:
+            return None
+        return self.root
+
+    def find_min(self):
+        if not self.root:
+            raise ValueError("error")
+        self._splay(-math.inf)
+        return self.root
+
+    def find_max(self):
+        if not self.root:
+            raise ValueError("error")
+        self._splay(math.inf)
+        return self.root
+
+    def delete(self, key):
+        self._splay(key)
+        node = self.root
+        if node is None or node.key != key:
+            raise ValueError("error")
+        if node.left is None:
+            self.root = node.right
+        elif node.right is None:
+            self.root = node.left
+        else:
+            self.root = node.left
+            self._splay(math.inf)
+            self.root.right = node.right
+        node.left = node.right = None
 
 
-def console_output(tree):
+# output_handler функция, принимающая на вход строку и реализующая ее вывод (по умолчанию в консоль)
+def console_output(tree, output_handler=print):
     if not tree.root:
-        print("_")
+        output_handler("_")
         return
 
-    print(f"[{tree.root.key} {tree.root.value}]")
+    output_handler(f"[{tree.root.key} {tree.root.value}]")
 
-    if not tree.root.has_left_child() and not tree.root.has_right_child():
+    if tree.root.left is None and tree.root.right is None:
         return
 
     current_len = 2
@@ -228,10 +509,11 @@ def console_output(tree):
     next_layer = {}
     stop = False
 
+    # в слое хранится вершина вместе с родителем, поэтому указатели на родителя в узлах не нужны
     if tree.root.left:
-        current_layer[0] = tree.root.left
+        current_layer[0] = tree.root.left, tree.root
     if tree.root.right:
-        current_layer[1] = tree.root.right
+        current_layer[1] = tree.root.right, tree.root
 
     while not stop:
         stop = True
@@ -240,72 +522,35 @@ def console_output(tree):
         previous_key = 0
 
         for key in keys:
-            node = current_layer.pop(key)
+            node, parent = current_layer.pop(key)
 
             print_value += "_ " * (key - previous_key)
 
             if node.left:
                 stop = False
-                next_layer[key * 2] = node.left
+                next_layer[key * 2] = node.left, node
             if node.right:
                 stop = False
-                next_layer[key * 2 + 1] = node.right
+                next_layer[key * 2 + 1] = node.right, node
 
-            parent_key = node.parent.key if node.parent else ''
-            print_value += f"[{node.key} {node.value} {parent_key}] "
+            print_value += f"[{node.key} {node.value} {parent.key}] "
             previous_key = key + 1
 
         print_value += "_ " * (current_len - previous_key)
-        print(print_value.strip())
+        output_handler(print_value.strip())
 
         current_layer = next_layer
         next_layer = {}
         current_len *= 2
 
 
+# обработчики команд протокола для дерева tree
+def commands(tree):
+    return tree_commands(tree, lambda output: console_output(tree, output.line))
+
+
 def main():
-    tree = SplayTree()
-
-    for line in sys.stdin:
-        add_match = re.match(r"^add\s+(-?\d+)\s+(.*)$", line)
-        set_match = re.match(r"^set\s+(-?\d+)\s+(.*)$", line)
-        search_match = re.match(r"^search\s+(-?\d+)$", line)
-        find_min_match = re.match(r"^min$", line)
-        find_max_match = re.match(r"^max$", line)
-        delete_match = re.match(r"^delete\s+(-?\d+)$", line)
-        print_match = re.match(r"^print$", line)
-
-        try:
-            if add_match:
-                key = int(add_match.group(1))
-                value = add_match.group(2)
-                tree.add(key, value)
-            elif set_match:
-                key = int(set_match.group(1))
-                value = set_match.group(2)
-                tree.set(key, value)
-            elif search_match:
-                key = int(search_match.group(1))
-                node = tree.search(key)
-                if node:
-                    print(f"1 {node.value}")
-                else:
-                    print("0")
-            elif find_min_match:
-                node = tree.find_min()
-                print(f"{node.key} {node.value}")
-            elif find_max_match:
-                node = tree.find_max()
-                print(f"{node.key} {node.value}")
-            elif delete_match:
-                key = int(delete_match.group(1))
-                tree.delete(key)
-            elif print_match:
-                tree.output()
-            else:
-                print("error")
-        except ValueError:
-            print("error")
+    run(sys.stdin, commands(SplayTree()), sys.stdout)
 
 
 if __name__ == "__main__":
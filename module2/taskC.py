@@ -1,12 +1,22 @@
 # Copyright Boris Ermolovich ermolovich.boris@gmail.com
 # двоичная min-куча
+import heapq
+import operator
 import sys
-import re
+from array import array
+from itertools import chain
 
+from protocol import run, NO_ARGS, KEY, KEY_VALUE
 
+
+# arity - число детей у вершины: дети вершины i - arity * i + 1, ..., arity * i + arity.
+# Чем больше arity, тем ниже куча и короче подъем, но на каждом уровне спуска больше сравнений
 class MinHeap:
 
-    def __init__(self):
+    def __init__(self, arity=2):
+        if arity < 2:
+            raise ValueError()
+        self.arity = arity
         self.heap_list = [] # [(key1: value1), (key2: value2), ...]
         self.index_map = {} # {key1: index1, key2: index2, ...}
 
@@ -14,20 +24,23 @@ class MinHeap:
         self.index_map[self.heap_list[i][0]], self.index_map[self.heap_list[j][0]] = j, i
         self.heap_list[i], self.heap_list[j] = self.heap_list[j], self.heap_list[i]
 
+    # спуск заканчивается, как только вершина меньше наименьшего из детей: ниже куча уже упорядочена
     def _sift_down(self, index):
-        while 2 * index + 1 < len(self.heap_list):
-            left = 2 * index + 1
-            right = 2 * index + 2
-            j = left
-            if right < len(self.heap_list) and self.heap_list[right][0] < self.heap_list[left][0]:
-                j = right
-            if self.heap_list[index][0] >= self.heap_list[j][0]:
-                self._swap(index, j)
+        heap = self.heap_list
+        while self.arity * index + 1 < len(heap):
+            first = self.arity * index + 1
+            j = first
+            for child in range(first + 1, min(first + self.arity, len(heap))):
+                if heap[child][0] < heap[j][0]:
+                    j = child
+            if not heap[j][0] < heap[index][0]:
+                break
+            self._swap(index, j)
             index = j
 
     def _sift_up(self, index):
         while index > 0:
-            parent = (index - 1) // 2
+            parent = (index - 1) // self.arity
             if self.heap_list[index][0] < self.heap_list[parent][0]:
                 self._swap(index, parent)
                 index = parent
@@ -62,7 +75,7 @@ class MinHeap:
     def max(self): # поиск среди листьев
         if not self.heap_list:
             raise ValueError()
-        first_leaf_index = len(self.heap_list) // 2
+        first_leaf_index = (len(self.heap_list) - 2) // self.arity + 1
         max_key, max_index, max_value = max(
             ((k, i, v) for i, (k, v) in enumerate(self.heap_list[first_leaf_index:], start=first_leaf_index)),
             key=lambda x: x[0])
@@ -77,12 +90,26 @@ class MinHeap:
         del self.index_map[key]
         if index == len(self.heap_list):
             return
-        if (index - 1) // 2 >= 0 and self.heap_list[index][0] < self.heap_list[(index - 1) // 2][0]:
+        if (index - 1) // self.arity >= 0 and self.heap_list[index][0] < self.heap_list[(index - 1) // self.arity][0]:
             self._sift_up(index)
             return
         self._sift_down(index)
 
 
+    # Замена ключа old_key на new_key с тем же значением: вершина остается на месте и затем спускается
+    # или поднимается. Нет old_key или new_key уже занят другой вершиной - ValueError
+    def change_key(self, old_key, new_key):
+        if old_key not in self.index_map or (new_key != old_key and new_key in self.index_map):
+            raise ValueError()
+        index = self.index_map.pop(old_key)
+        self.heap_list[index] = (new_key, self.heap_list[index][1])
+        self.index_map[new_key] = index
+        self._sift_down(index)
+        self._sift_up(self.index_map[new_key])
+
+    def __len__(self):
+        return len(self.heap_list)
+
     def extract_min(self):
         if not self.heap_list:
             raise ValueError()
@@ -90,75 +117,412 @@ class MinHeap:
         self.delete(min_key)
         return min_key, min_value
 
+    # Добавление пакета пар (ключ, значение) за O(n) для итоговой кучи из n элементов: пары дописываются в конец,
+    # куча перестраивается снизу вверх (алгоритм Флойда), index_map строится один раз. Если ключ уже есть в куче
+    # или повторяется в пакете - ValueError, куча не меняется
+    def add_many(self, items):
+        items = [(key, value) for key, value in items]
+        keys = {key for key, _ in items}
+        if len(keys) != len(items) or not keys.isdisjoint(self.index_map):
+            raise ValueError()
+        self.heap_list.extend(items)
+        self._heapify()
+
+    def _heapify(self):
+        heap = self.heap_list
+        for start in reversed(range((len(heap) - 2) // self.arity + 1)):
+            item = heap[start]
+            index = start
+            while self.arity * index + 1 < len(heap):
+                first = self.arity * index + 1
+                child = first
+                for other in range(first + 1, min(first + self.arity, len(heap))):
+                    if heap[other][0] < heap[child][0]:
+                        child = other
+                if item[0] < heap[child][0]:
+                    break
+                heap[index] = heap[child]
+                index = child
+            heap[index] = item
+        self.index_map = {key: index for index, (key, _) in enumerate(heap)}
+
+    # k наименьших пар (ключ, значение) по возрастанию ключа с удалением из кучи
+    def extract_many(self, k):
+        if not 0 <= k <= len(self):
+            raise ValueError()
+        return [self.extract_min() for _ in range(k)]
+
+    # вершины, которые становятся кандидатами в следующий минимум после выдачи вершины index
+    def _successors(self, index):
+        return range(self.arity * index + 1, self.arity * index + self.arity + 1)
+
+    # k наименьших пар по возрастанию ключа без изменения кучи, за O(k log k): во вспомогательной куче
+    # лежат кандидаты, и вместо выданной вершины в нее добавляются ее последователи
+    def peek_k(self, k):
+        if not 0 <= k <= len(self.heap_list):
+            raise ValueError()
+        result = []
+        candidates = [(self.heap_list[0][0], 0)] if k else []
+        while len(result) < k:
+            _, index = heapq.heappop(candidates)
+            result.append(self.heap_list[index])
+            for successor in self._successors(index):
+                if successor < len(self.heap_list):
+                    heapq.heappush(candidates, (self.heap_list[successor][0], successor))
+        return result
+
+    def extract_max(self):
+        max_key, _, max_value = self.max()
+        self.delete(max_key)
+        return max_key, max_value
+
     # output_handler функция, принимающая на вход строку и реализующая ее вывод (по умолчанию в консоль)
     def output_heap(self, output_handler=print):
-        if not self.heap_list:
+        heap_list = self.heap_list
+        if not heap_list:
             output_handler("_")
             return
 
-        output_handler(f'[{self.heap_list[0][0]} {self.heap_list[0][1]}]')
+        output_handler(f'[{heap_list[0][0]} {heap_list[0][1]}]')
 
-        current_level, level_size = 1, 2
-        while level_size <= len(self.heap_list):
-            items = self.heap_list[current_level:current_level + level_size]
+        current_level, level_size = 1, self.arity
+        while current_level < len(heap_list):
+            items = heap_list[current_level:current_level + level_size]
             if len(items) == level_size:
-                output_handler(' '.join(f'[{key} {value} {self.heap_list[(current_level + j - 1) // 2][0]}]'
+                output_handler(' '.join(f'[{key} {value} {heap_list[(current_level + j - 1) // self.arity][0]}]'
                                for j, (key, value) in enumerate(items)))
             else:
-                output_handler(' '.join(f'[{key} {value} {self.heap_list[(current_level + j - 1) // 2][0]}]'
+                output_handler(' '.join(f'[{key} {value} {heap_list[(current_level + j - 1) // self.arity][0]}]'
                                for j, (key, value) in enumerate(items)) + ' ' +  ' '.join(['_'] * (level_size - len(items))))
             current_level += level_size
-            level_size *= 2
+            level_size *= self.arity
 
-def main():
-    heap = MinHeap()
-
-    for line in sys.stdin:
-        if not line.strip():
-            continue
-        add_match = re.match(r"^add\s+(-?\d+)\s+(.*)$", line)
-        set_match = re.match(r"^set\s+(-?\d+)\s+(.*)$", line)
-        search_match = re.match(r"^search\s+(-?\d+)$", line)
-        min_match = re.match(r"^min$", line)
-        max_match = re.match(r"^max$", line)
-        delete_match = re.match(r"^delete\s+(-?\d+)$", line)
-        extract_min_match = re.match(r"^extract$", line)
-        print_match = re.match(r"^print$", line)
+# Min-max куча с тем же интерфейсом и теми же ошибками, что у MinHeap. heap_list хранится так же, по уровням
+# (дети вершины i - 2i + 1 и 2i + 2), но уровни с четной глубиной (корень - глубина 0) - минимальные: ключ
+# не больше всех ключей своего поддерева, а уровни с нечетной глубиной - максимальные: ключ не меньше всех
+# ключей поддерева. Минимум всегда имеет индекс 0, максимум - индекс 0, 1 или 2, поэтому min и max работают
+# за O(1), а add, delete, extract_min и extract_max - за O(log n). search, min и max сообщают индексы в этом массиве
+class MinMaxHeap(MinHeap):
 
-        try:
-            if add_match:
-                key = int(add_match.group(1))
-                value = add_match.group(2)
-                heap.add(key, value)
-            elif set_match:
-                key = int(set_match.group(1))
-                value = set_match.group(2)
-                heap.set(key, value)
-            elif search_match:
-                key = int(search_match.group(1))
-                result = heap.search(key)
-                if result:
-                    print(f"1 {result[0]} {result[1]}")
-                else:
-                    print("0")
-            elif min_match:
-                result = heap.min()
-                print(f"{result[0]} {result[1]} {result[2]}")
-            elif max_match:
-                result = heap.max()
-                print(f"{result[0]} {result[1]} {result[2]}")
-            elif delete_match:
-                key = int(delete_match.group(1))
-                heap.delete(key)
-            elif extract_min_match:
-                result = heap.extract_min()
-                print(f"{result[0]} {result[1]}")
-            elif print_match:
-                heap.output_heap()
+    # индексы детей и внуков в методах ниже рассчитаны на двоичную кучу
+    def __init__(self):
+        super().__init__()
+
+    @staticmethod
+    def _is_min_level(index):
+        return (index + 1).bit_length() % 2 == 1
+
+    # подъем через уровень по уровням одного типа, before - порядок на них (operator.lt или operator.gt)
+    def _sift_up_levels(self, index, before):
+        while index > 2:
+            grandparent = (index - 3) // 4
+            if before(self.heap_list[index][0], self.heap_list[grandparent][0]):
+                self._swap(index, grandparent)
+                index = grandparent
             else:
-                print("error")
-        except ValueError:
-            print("error")
+                break
+
+    def _sift_up(self, index):
+        if index == 0:
+            return
+        parent = (index - 1) // 2
+        before, other = (operator.lt, operator.gt) if self._is_min_level(index) else (operator.gt, operator.lt)
+        if before(self.heap_list[parent][0], self.heap_list[index][0]):
+            self._swap(index, parent)
+            self._sift_up_levels(parent, other)
+        else:
+            self._sift_up_levels(index, before)
+
+    # спуск с выбором лучшего среди детей и внуков; внук, оказавшийся не на своей стороне от родителя,
+    # меняется с ним местами
+    def _sift_down(self, index):
+        heap = self.heap_list
+        size = len(heap)
+        before = operator.lt if self._is_min_level(index) else operator.gt
+        while 2 * index + 1 < size:
+            best = 2 * index + 1
+            best_key = heap[best][0]
+            # второй ребенок и внуки
+            for j in chain(range(best + 1, min(best + 2, size)), range(4 * index + 3, min(4 * index + 7, size))):
+                if before(heap[j][0], best_key):
+                    best, best_key = j, heap[j][0]
+            if not before(best_key, heap[index][0]):
+                break
+            self._swap(best, index)
+            if best <= 2 * index + 2:
+                break
+            parent = (best - 1) // 2
+            if before(heap[parent][0], heap[best][0]):
+                self._swap(best, parent)
+            index = best
+
+    def _heapify(self):
+        self.index_map = {key: index for index, (key, _) in enumerate(self.heap_list)}
+        for index in reversed(range(len(self.heap_list) // 2)):
+            self._sift_down(index)
+
+    # Каждая вершина не меньше своего родителя или деда на минимальном уровне, поэтому после вершины минимального
+    # уровня кандидатами становятся ее дети и внуки, а после вершины максимального уровня - никто:
+    # ее дети - внуки минимальной вершины и уже добавлены
+    def _successors(self, index):
+        if not self._is_min_level(index):
+            return ()
+        return 2 * index + 1, 2 * index + 2, 4 * index + 3, 4 * index + 4, 4 * index + 5, 4 * index + 6
+
+    def max(self):
+        if not self.heap_list:
+            raise ValueError()
+        if len(self.heap_list) == 1:
+            index = 0
+        elif len(self.heap_list) == 2 or self.heap_list[1][0] > self.heap_list[2][0]:
+            index = 1
+        else:
+            index = 2
+        max_key, max_value = self.heap_list[index]
+        return max_key, index, max_value
+
+    # на место удаленной вершины встает последняя: сначала она спускается, затем поднимается с того места,
+    # где остановилась
+    def delete(self, key):
+        if not self.heap_list or key not in self.index_map:
+            raise ValueError()
+        index = self.index_map[key]
+        self._swap(index, len(self.heap_list) - 1)
+        self.heap_list.pop()
+        del self.index_map[key]
+        if index == len(self.heap_list):
+            return
+        moved_key = self.heap_list[index][0]
+        self._sift_down(index)
+        self._sift_up(self.index_map[moved_key])
+
+
+# Куча с теми же операциями, индексами и ошибками, что у MinHeap той же арности, но без кортежей: ключи лежат
+# в array('q') (целые из диапазона int64, иначе ValueError), значения - в параллельном списке values,
+# позиции ключей - в index_map. Просеивание переносит ключ и значение в освободившуюся ячейку вместо обмена
+# парами, а set меняет только values. heap_list собирается из массивов при каждом обращении
+class ArrayHeap(MinHeap):
+
+    def __init__(self, arity=2):
+        if arity < 2:
+            raise ValueError()
+        self.arity = arity
+        self.keys = array('q')
+        self.values = []
+        self.index_map = {}
+
+    @property
+    def heap_list(self):
+        return list(zip(self.keys, self.values))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _swap(self, i, j):
+        keys, values = self.keys, self.values
+        self.index_map[keys[i]], self.index_map[keys[j]] = j, i
+        keys[i], keys[j] = keys[j], keys[i]
+        values[i], values[j] = values[j], values[i]
+
+    def _sift_down(self, index):
+        keys, values, positions, arity = self.keys, self.values, self.index_map, self.arity
+        size = len(keys)
+        key, value = keys[index], values[index]
+        while arity * index + 1 < size:
+            first = arity * index + 1
+            j = first
+            child_key = keys[first]
+            for child in range(first + 1, min(first + arity, size)):
+                other_key = keys[child]
+                if other_key < child_key:
+                    j, child_key = child, other_key
+            if not child_key < key:
+                break
+            keys[index] = child_key
+            values[index] = values[j]
+            positions[child_key] = index
+            index = j
+        keys[index] = key
+        values[index] = value
+        positions[key] = index
+
+    def _sift_up(self, index):
+        keys, values, positions, arity = self.keys, self.values, self.index_map, self.arity
+        key, value = keys[index], values[index]
+        while index > 0:
+            parent = (index - 1) // arity
+            parent_key = keys[parent]
+            if not key < parent_key:
+                break
+            keys[index] = parent_key
+            values[index] = values[parent]
+            positions[parent_key] = index
+            index = parent
+        keys[index] = key
+        values[index] = value
+        positions[key] = index
+
+    def add(self, key, value):
+        if key in self.index_map:
+            raise ValueError()
+        try:
+            self.keys.append(key)
+        except OverflowError:
+            raise ValueError()
+        self.values.append(value)
+        self.index_map[key] = len(self.keys) - 1
+        self._sift_up(len(self.keys) - 1)
+
+    def set(self, key, value):
+        if key not in self.index_map:
+            raise ValueError()
+        self.values[self.index_map[key]] = value
+
+    def search(self, key):
+        if key not in self.index_map:
+            return None
+        index = self.index_map[key]
+        return index, self.values[index]
+
+    def min(self):
+        if not self.keys:
+            raise ValueError()
+        return self.keys[0], 0, self.values[0]
+
+    def max(self): # поиск среди листьев
+        if not self.keys:
+            raise ValueError()
+        first_leaf_index = (len(self.keys) - 2) // self.arity + 1
+        max_index = max(range(first_leaf_index, len(self.keys)), key=self.keys.__getitem__)
+        return self.keys[max_index], max_index, self.values[max_index]
+
+    # на место удаленной вершины переносится последняя, как в MinHeap.delete
+    def delete(self, key):
+        if key not in self.index_map:
+            raise ValueError()
+        index = self.index_map.pop(key)
+        last_key = self.keys.pop()
+        last_value = self.values.pop()
+        if index == len(self.keys):
+            return
+        self.keys[index] = last_key
+        self.values[index] = last_value
+        self.index_map[last_key] = index
+        if index > 0 and last_key < self.keys[(index - 1) // self.arity]:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def change_key(self, old_key, new_key):
+        if old_key not in self.index_map or (new_key != old_key and new_key in self.index_map):
+            raise ValueError()
+        index = self.index_map[old_key]
+        try:
+            self.keys[index] = new_key
+        except OverflowError:
+            raise ValueError()
+        del self.index_map[old_key]
+        self.index_map[new_key] = index
+        self._sift_down(index)
+        self._sift_up(self.index_map[new_key])
+
+    def extract_min(self):
+        if not self.keys:
+            raise ValueError()
+        min_key, min_value = self.keys[0], self.values[0]
+        self.delete(min_key)
+        return min_key, min_value
+
+    def add_many(self, items):
+        keys = array('q')
+        values = []
+        try:
+            for key, value in items:
+                keys.append(key)
+                values.append(value)
+        except OverflowError:
+            raise ValueError()
+        if len(set(keys)) != len(keys) or not self.index_map.keys().isdisjoint(keys):
+            raise ValueError()
+        self.keys.extend(keys)
+        self.values.extend(values)
+        self._heapify()
+
+    def _heapify(self):
+        keys, values, arity = self.keys, self.values, self.arity
+        size = len(keys)
+        for start in reversed(range((size - 2) // arity + 1)):
+            key, value = keys[start], values[start]
+            index = start
+            while arity * index + 1 < size:
+                first = arity * index + 1
+                child = first
+                for other in range(first + 1, min(first + arity, size)):
+                    if keys[other] < keys[child]:
+                        child = other
+                if key < keys[child]:
+                    break
+                keys[index] = keys[child]
+                values[index] = values[child]
+                index = child
+            keys[index] = key
+            values[index] = value
+        self.index_map = dict(zip(keys, range(size)))
+
+    def peek_k(self, k):
+        if not 0 <= k <= len(self.keys):
+            raise ValueError()
+        keys, values = self.keys, self.values
+        result = []
+        candidates = [(keys[0], 0)] if k else []
+        while len(result) < k:
+            _, index = heapq.heappop(candidates)
+            result.append((keys[index], values[index]))
+            for successor in self._successors(index):
+                if successor < len(keys):
+                    heapq.heappush(candidates, (keys[successor], successor))
+        return result
+
+
+# обработчики команд протокола для кучи heap
+def commands(heap):
+    def search(output, key):
+        result = heap.search(key)
+        output.line(f"1 {result[0]} {result[1]}" if result else "0")
+
+    def find_min(output):
+        result = heap.min()
+        output.line(f"{result[0]} {result[1]} {result[2]}")
+
+    def find_max(output):
+        result = heap.max()
+        output.line(f"{result[0]} {result[1]} {result[2]}")
+
+    def extract_min(output):
+        result = heap.extract_min()
+        output.line(f"{result[0]} {result[1]}")
+
+    return {
+        'add': (KEY_VALUE, lambda output, key, value: heap.add(key, value)),
+        'set': (KEY_VALUE, lambda output, key, value: heap.set(key, value)),
+        'search': (KEY, search),
+        'min': (NO_ARGS, find_min),
+        'max': (NO_ARGS, find_max),
+        'delete': (KEY, lambda output, key: heap.delete(key)),
+        'extract': (NO_ARGS, extract_min),
+        'print': (NO_ARGS, lambda output: heap.output_heap(output.line)),
+    }
+
+
+def main():
+    arity = int(sys.argv[sys.argv.index('--arity') + 1]) if '--arity' in sys.argv else 2
+    if '--min-max' in sys.argv[1:]:
+        heap = MinMaxHeap()
+    elif '--arrays' in sys.argv[1:]:
+        heap = ArrayHeap(arity)
+    else:
+        heap = MinHeap(arity)
+    run(sys.stdin, commands(heap), sys.stdout, skip_blank=True)
 
 if __name__ == "__main__":
     main()